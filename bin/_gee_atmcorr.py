@@ -0,0 +1,26 @@
+"""
+_gee_atmcorr.py
+
+The modules live in the gee_atmcorr package; the files of bin/ are shims that
+make 'import getBOA' (notebooks with bin/ in sys.path) and 'python bin/incremental.py'
+use them, without installing the package.
+"""
+
+import importlib
+import os
+import sys
+
+
+def alias(name, module):
+    """
+    make module 'name' (a shim) the module gee_atmcorr.<module>, or run its
+    main() if the shim is run as a script
+    """
+    try:
+        import gee_atmcorr
+    except ImportError:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    module = importlib.import_module('gee_atmcorr.' + module)
+    if name == '__main__':
+        sys.exit(module.main())
+    sys.modules[name] = module
@@ -0,0 +1,3 @@
+# shim for the notebooks, the code is in gee_atmcorr/infocache.py
+import _gee_atmcorr
+_gee_atmcorr.alias(__name__, 'infocache')
@@ -0,0 +1,10 @@
+"""
+gee_atmcorr
+
+Multi-sensor atmospheric correction (Py6S) in the Google Earth Engine Python API.
+The modules are imported one by one (nothing is loaded here, see lazy.py):
+
+from gee_atmcorr import getBOA, mission_specifics as mn
+
+bin/ keeps one shim per module for the notebooks (sys.path.append('bin'); import getBOA).
+"""
@@ -0,0 +1,322 @@
+"""
+ancillary.py
+
+Atmospheric constituents (H2O, O3, AOT) used by the correction, see atmospheric.py
+
+- constituents(): the three values for one target in a single request (cached)
+- prefetch(): metadata, target point and constituents of many scenes in one request
+- fetch(): constituents (and SRTM altitudes) of many points, batched
+- export(): bulk extraction for many (point, date) pairs, resolved in batches of
+  one request each and streamed to a Parquet or Arrow file with the dataset used
+  for every value (NCEP, TOMS, ozone_fill, MOD08_M3 or AOT_stack)
+- warm(): load an exported file into the cache used by parameters.BOA
+- fallback(): use a local snapshot of the ozone/AOT fill climatologies (see
+  climatology.py): the server only evaluates the measured products and the
+  gaps are filled on the client
+
+Usage
+scenes = ancillary.prefetch(images)
+ancillary.export(zip(points,dates),'atmosphere.parquet')
+ancillary.export(ancillary.daily(points,start,end),'daily.arrow')
+ancillary.warm('atmosphere.parquet')
+ancillary.fallback('climatology')
+"""
+
+import calendar
+import datetime
+import itertools
+from . import lazy
+ee = lazy.Module('ee')
+from .atmospheric import Atmospheric
+from . import climatology
+from . import elevation
+from . import infocache
+
+# (point, date) pairs per request
+BATCH_SIZE = 200
+
+# scenes per prefetch request (full metadata, point and constituents of each)
+SCENE_BATCH_SIZE = 50
+
+COLUMNS = ['lon','lat','time','h2o','h2o_source','o3','o3_source','aot','aot_source']
+
+# (location_key, time in ms) -> (h2o, o3, aot)
+_cache = {}
+
+# local fill climatologies (None = filled on the server)
+_fills = None
+
+
+def _millis(date):
+    """
+    time in ms from a (UTC) datetime or ms
+    """
+    if isinstance(date, datetime.datetime):
+        return calendar.timegm(date.utctimetuple())*1000 + date.microsecond//1000
+    return int(date)
+
+
+def _key(coord, millis):
+    return (elevation.location_key(coord), millis)
+
+
+def fallback(directory=None):
+    """
+    Fill missing ozone and AOT from the climatology snapshot in 'directory'
+    (see climatology.snapshot) instead of on the server. None = server fills.
+    """
+    global _fills
+    _fills = None if directory is None else climatology.load(directory)
+    return _fills
+
+
+def _constituents(point, ee_date, source=False):
+    # H2O, O3 and AOT (server side), without the fill branches if filled locally
+    fill = _fills is None
+    return [Atmospheric.water(point,ee_date,source=source),
+            Atmospheric.ozone(point,ee_date,source=source,fill=fill),
+            Atmospheric.aerosol(point,ee_date,source=source,fill=fill)]
+
+
+def _fill_gaps(coords, times, o3, aot):
+    """
+    Replace missing (None) O3 and AOT values in place with the local
+    climatology (one vectorized lookup each). Returns the filled indices.
+    """
+    filled = []
+    for values, lookup in [(o3, _fills.ozone), (aot, _fills.aot)]:
+        gaps = [i for i, value in enumerate(values) if value is None]
+        if gaps:
+            for i, value in zip(gaps, lookup([coords[i] for i in gaps], [times[i] for i in gaps])):
+                values[i] = float(value)
+        filled.append(gaps)
+    return filled
+
+
+def constituents(coord, date, point=None):
+    """
+    H2O, O3 and AOT (Py6S units) at [lon,lat] and date, in one request (cached).
+
+    point: server-side geometry to use instead of 'coord' (e.g. image centroid)
+    """
+    millis = _millis(date)
+    key = _key(coord, millis)
+    if key not in _cache:
+        if point is None:
+            point = ee.Geometry.Point(list(coord))
+        ee_date = ee.Date(millis)
+        h2o, o3, aot = infocache.getInfo(ee.List(_constituents(point,ee_date)))
+        if _fills is not None:
+            o3, aot = [o3], [aot]
+            _fill_gaps([coord], [millis], o3, aot)
+            o3, aot = o3[0], aot[0]
+        _cache[key] = (h2o, o3, aot)
+    return _cache[key]
+
+
+def prefetch(images, altitude=None, atmosphere=True, batch_size=SCENE_BATCH_SIZE):
+    """
+    Metadata, target point (see elevation.centroid) and constituents of many
+    scenes, one request per 'batch_size' scenes; 'SRTM' altitudes too if
+    altitude='SRTM'.
+    atmosphere=False skips constituents and altitudes (e.g. resolved per
+    datatake group by datatake.share).
+
+    Warms the caches used by parameters.BOA and returns one scene per image:
+    {'properties': image properties, 'coordinates': [lon,lat] of the target}
+    """
+    images = list(images)
+    scenes = []
+    for start in range(0, len(images), batch_size):
+        scenes += _prefetch(images[start:start + batch_size], altitude, atmosphere)
+    return scenes
+
+
+def _prefetch(images, altitude, atmosphere):
+    # one prefetch request
+    srtm = atmosphere and isinstance(altitude, str)
+    requests = []
+    for image in images:
+        image = ee.Image(image)
+        point = elevation.centroid(image)
+        ee_date = ee.Date(image.get('system:time_start'))
+        values = [image.toDictionary(image.propertyNames()), point]
+        if atmosphere:
+            values += _constituents(point,ee_date)
+        if srtm:
+            values.append(Atmospheric.altitude(point))
+        requests.append(ee.List(values))
+
+    results = infocache.getInfo(ee.List(requests))
+    if atmosphere and _fills is not None:
+        o3 = [values[3] for values in results]
+        aot = [values[4] for values in results]
+        _fill_gaps([values[1]['coordinates'] for values in results],
+                   [values[0]['system:time_start'] for values in results], o3, aot)
+        for values, o3_value, aot_value in zip(results, o3, aot):
+            values[3], values[4] = o3_value, aot_value
+
+    scenes = []
+    for values in results:
+        properties, coord = values[0], values[1]['coordinates']
+        if atmosphere:
+            _cache[_key(coord, properties['system:time_start'])] = tuple(values[2:5])
+        if srtm:
+            elevation.store(coord, values[5])
+        scenes.append({'properties': properties, 'coordinates': coord})
+
+    return scenes
+
+
+def fetch(pairs, altitude=None, batch_size=BATCH_SIZE):
+    """
+    Constituents (and 'SRTM' altitudes if altitude='SRTM') of ([lon,lat], date)
+    pairs into the caches used by parameters.BOA, one request per 'batch_size'
+    pairs (e.g. the shared atmosphere of datatake groups, see datatake.share)
+    """
+    srtm = isinstance(altitude, str)
+    pairs = list(pairs)
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        requests = []
+        for coord, date in batch:
+            point = ee.Geometry.Point(list(coord))
+            values = _constituents(point,ee.Date(_millis(date)))
+            if srtm:
+                values.append(Atmospheric.altitude(point))
+            requests.append(ee.List(values))
+
+        results = infocache.getInfo(ee.List(requests))
+        coords = [coord for coord, date in batch]
+        times = [_millis(date) for coord, date in batch]
+        if _fills is not None:
+            o3 = [values[1] for values in results]
+            aot = [values[2] for values in results]
+            _fill_gaps(coords, times, o3, aot)
+            for values, o3_value, aot_value in zip(results, o3, aot):
+                values[1], values[2] = o3_value, aot_value
+
+        for coord, millis, values in zip(coords, times, results):
+            _cache[_key(coord, millis)] = tuple(values[:3])
+            if srtm:
+                elevation.store(coord, values[3])
+
+
+def resolve(pairs, batch_size=BATCH_SIZE, warm=False):
+    """
+    Generator of column batches (dict of lists, see COLUMNS) for an iterable
+    of ([lon,lat], date) pairs. Each batch is one request.
+
+    warm: also store the values in the constituents cache (unbounded, i.e.
+    only for as many pairs as the cache should hold)
+    """
+    pairs = iter(pairs)
+    while True:
+        batch = list(itertools.islice(pairs, batch_size))
+        if not batch:
+            return
+
+        requests = []
+        for coord, date in batch:
+            point = ee.Geometry.Point(list(coord))
+            ee_date = ee.Date(_millis(date))
+            requests.append(ee.List(_constituents(point,ee_date,source=True)))
+
+        results = infocache.getInfo(ee.List(requests))
+        if _fills is not None:
+            o3 = [values[1][0] for values in results]
+            aot = [values[2][0] for values in results]
+            o3_gaps, aot_gaps = map(set, _fill_gaps([coord for coord, date in batch],
+                                           [_millis(date) for coord, date in batch], o3, aot))
+            for i, values in enumerate(results):
+                values[1] = [o3[i], 'ozone_fill' if i in o3_gaps else values[1][1]]
+                values[2] = [aot[i], 'AOT_stack' if i in aot_gaps else values[2][1]]
+
+        columns = {name: [] for name in COLUMNS}
+        for (coord, date), values in zip(batch, results):
+            (h2o, h2o_source), (o3, o3_source), (aot, aot_source) = values
+            millis = _millis(date)
+            if warm:
+                _cache[_key(coord, millis)] = (h2o, o3, aot)
+            row = [coord[0], coord[1], millis, h2o, h2o_source, o3, o3_source, aot, aot_source]
+            for name, value in zip(COLUMNS, row):
+                columns[name].append(value)
+
+        yield columns
+
+
+def daily(points, start, end, hour=12):
+    """
+    ([lon,lat], date) pairs for every day in [start, end) at 'hour' UTC
+    """
+    day = datetime.datetime(start.year, start.month, start.day, hour)
+    while day < end:
+        for point in points:
+            yield point, day
+        day += datetime.timedelta(days=1)
+
+
+def _schema(pa):
+    return pa.schema([('lon', pa.float64()), ('lat', pa.float64()), ('time', pa.timestamp('ms', tz='UTC')),
+                      ('h2o', pa.float64()), ('h2o_source', pa.string()),
+                      ('o3', pa.float64()), ('o3_source', pa.string()),
+                      ('aot', pa.float64()), ('aot_source', pa.string())])
+
+
+def export(pairs, path, batch_size=BATCH_SIZE, warm=False):
+    """
+    Resolve ([lon,lat], date) pairs in batches and stream them to 'path'
+    (Parquet if it ends with .parquet, else Arrow IPC). Only one batch is held
+    in memory at a time (unless warm=True, see resolve). Returns the number
+    of rows written.
+    """
+    import pyarrow as pa
+
+    schema = _schema(pa)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+
+    rows = 0
+    try:
+        for columns in resolve(pairs, batch_size, warm):
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            rows += len(columns['time'])
+    finally:
+        writer.close()
+
+    return rows
+
+
+def warm(path):
+    """
+    Load an exported file into the constituents cache. Returns the number of rows.
+    """
+    import pyarrow as pa
+
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(columns=['lon','lat','time','h2o','o3','aot'])
+    else:
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+    rows = 0
+    for batch in batches:
+        columns = batch.to_pydict()
+        times = batch.column('time').cast(pa.int64()).to_pylist()
+        for lon, lat, millis, h2o, o3, aot in zip(columns['lon'], columns['lat'], times,
+                                                  columns['h2o'], columns['o3'], columns['aot']):
+            _cache[_key([lon, lat], millis)] = (h2o, o3, aot)
+            rows += 1
+
+    return rows
+
+
+def clear_cache():
+    """
+    forget all cached constituents
+    """
+    _cache.clear()
@@ -0,0 +1,303 @@
+"""
+atmospheric.py, Sam Murphy (2016-10-26)
+
+Atmospheric water vapour, ozone and AOT from GEE
+
+Usage
+H2O = Atmospheric.water(geom,date)
+O3 = Atmospheric.ozone(geom,date)
+AOT = Atmospheric.aerosol(geom,date)
+km = Atmospheric.altitude(geom)
+
+H2O, dataset = Atmospheric.water(geom,date,source=True) # i.e. ee.List([value,dataset])
+O3 = Atmospheric.ozone(geom,date,fill=False) # null instead of the fill value (see climatology.py)
+
+"""
+
+
+from . import lazy
+ee = lazy.Module('ee')
+
+class Atmospheric():
+    
+    def round_date(date,xhour):
+        """
+        rounds a date of to the closest 'x' hours
+        """
+        y = date.get('year')
+        m = date.get('month')
+        d = date.get('day')
+        H = date.get('hour')
+        HH = H.divide(xhour).round().multiply(xhour)
+        return date.fromYMD(y,m,d).advance(HH,'hour')
+  
+    def round_month(date):
+        """
+        round date to closest month
+        """
+        # start of THIS month
+        m1 = date.fromYMD(date.get('year'),date.get('month'),ee.Number(1))
+
+        # start of NEXT month
+        m2 = m1.advance(1,'month')
+
+        # difference from date
+        d1 = ee.Number(date.difference(m1,'day')).abs()
+        d2 = ee.Number(date.difference(m2,'day')).abs()
+
+        # return closest start of month
+        return ee.Date(ee.Algorithms.If(d2.gt(d1),m1,m2))
+  
+  
+  
+    def water(coord,date,source=False):
+        """
+        Water vapour column above target at time of image aquisition.
+
+        (Kalnay et al., 1996, The NCEP/NCAR 40-Year Reanalysis Project. Bull. 
+        Amer. Meteor. Soc., 77, 437-471)
+
+        source=True returns ee.List([value,'NCEP'])
+        """
+
+        # Point geometry required
+       # centroid = geom.centroid()
+
+        # H2O datetime is in 6 hour intervals
+        H2O_date = Atmospheric.round_date(date,6)
+
+        # filtered water collection
+        water_ic = ee.ImageCollection('NCEP_RE/surface_wv').filterDate(H2O_date, H2O_date.advance(1,'month'))
+
+        # water image
+        water_img = ee.Image(water_ic.first())
+
+        # water_vapour at target
+        water = water_img.reduceRegion(reducer = ee.Reducer.mean(), geometry = coord).get('pr_wtr')
+
+        # convert to Py6S units (Google = kg/m^2, Py6S = g/cm^2)
+        water_Py6S_units = ee.Number(water).divide(10)                                   
+
+        if source:
+            return ee.List([water_Py6S_units,'NCEP'])
+
+        return water_Py6S_units
+  
+  
+  
+    def ozone(coord,date,source=False,fill=True):
+        """
+        returns ozone measurement from merged TOMS/OMI dataset
+
+        OR
+
+        uses our fill value (which is mean value for that latlon and day-of-year)
+
+        source=True returns ee.List([value,'TOMS' or 'ozone_fill'])
+        fill=False returns null instead of the fill value (i.e. filled on the client, see climatology.py)
+        """
+
+        # Point geometry required
+        #centroid = geom.centroid()
+
+        def ozone_image(O3_date):
+            # filtered ozone collection
+            ozone_ic = ee.ImageCollection('TOMS/MERGED').filterDate(O3_date, O3_date.advance(1,'month'))
+
+            # ozone image
+            return ee.Image(ozone_ic.first())
+       
+        def ozone_measurement(coord,O3_date):
+            # ozone image
+            ozone_img = ozone_image(O3_date)
+
+            # ozone value IF TOMS/OMI image exists ELSE use fill value
+            ozone = ee.Algorithms.If(ozone_img,\
+            ozone_img.reduceRegion(reducer = ee.Reducer.mean(), geometry = coord).get('ozone'),\
+            ozone_fill(coord,O3_date))
+
+            return ozone
+      
+        def ozone_fill(coord,O3_date):
+            """
+            Gets our ozone fill value (i.e. mean value for that doy and latlon)
+
+            you can see it
+            1) compared to LEDAPS: https://code.earthengine.google.com/8e62a5a66e4920e701813e43c0ecb83e
+            2) as a video: https://www.youtube.com/watch?v=rgqwvMRVguI&feature=youtu.be
+
+            """
+
+            # ozone fills (i.e. one band per doy)
+            ozone_fills = ee.ImageCollection('users/samsammurphy/public/ozone_fill').toList(366)
+
+            # day of year index
+            jan01 = ee.Date.fromYMD(O3_date.get('year'),1,1)
+            doy_index = date.difference(jan01,'day').toInt()# (NB. index is one less than doy, so no need to +1)
+
+            # day of year image
+            fill_image = ee.Image(ozone_fills.get(doy_index))
+
+            # return scalar fill value
+            return fill_image.reduceRegion(reducer = ee.Reducer.mean(), geometry = coord).get('ozone')
+
+        def ozone_measured(coord,O3_date):
+            """
+            TOMS/OMI measurement, or null
+            """
+            ozone_img = ozone_image(O3_date)
+
+            return ee.Algorithms.If(ozone_img,\
+            ozone_img.reduceRegion(reducer = ee.Reducer.mean(), geometry = coord).get('ozone'),\
+            None)
+
+        def ozone_source(coord,O3_date):
+            """
+            'TOMS' if the TOMS/OMI measurement is used, else 'ozone_fill'
+            """
+            measured = ozone_measured(coord,O3_date)
+
+            return ee.Algorithms.If(TOMS_gap.contains(O3_date),'ozone_fill',ee.Algorithms.If(measured,'TOMS','ozone_fill'))
+     
+        # O3 datetime in 24 hour intervals
+        O3_date = Atmospheric.round_date(date,24)
+
+        # TOMS temporal gap
+        TOMS_gap = ee.DateRange('1994-11-01','1996-08-01')  
+
+        if not fill:
+            # measurement only, no fill branches in the graph
+            measured = ee.Algorithms.If(TOMS_gap.contains(O3_date),None,ozone_measured(coord,O3_date))
+            ozone_Py6S_units = ee.Algorithms.If(measured,ee.Number(measured).divide(1000),None)
+            if source:
+                return ee.List([ozone_Py6S_units,ee.Algorithms.If(measured,'TOMS',None)])
+            return ozone_Py6S_units
+
+        # avoid TOMS gap entirely
+        ozone = ee.Algorithms.If(TOMS_gap.contains(O3_date),ozone_fill(coord,O3_date),ozone_measurement(coord,O3_date))
+
+        # fix other data gaps (e.g. spatial, missing images, etc..)
+        ozone = ee.Algorithms.If(ozone,ozone,ozone_fill(coord,O3_date))
+
+        #convert to Py6S units 
+        ozone_Py6S_units = ee.Number(ozone).divide(1000)# (i.e. Dobson units are milli-atm-cm )                             
+
+        if source:
+            return ee.List([ozone_Py6S_units,ozone_source(coord,O3_date)])
+
+        return ozone_Py6S_units
+ 
+
+    def aerosol(coord,date,source=False,fill=True):
+
+        """
+        Aerosol Optical Thickness.
+
+        try:
+          MODIS Aerosol Product (monthly)
+        except:
+          fill value
+
+        source=True returns ee.List([value,'MOD08_M3' or 'AOT_stack'])
+        fill=False returns null instead of the fill value (i.e. filled on the client, see climatology.py)
+        """
+    
+        def aerosol_fill(date):
+            
+            """
+            MODIS AOT fill value for this month (i.e. no data gaps)
+            """
+            return ee.Image('users/samsammurphy/public/AOT_stack')\
+                     .select([ee.String('AOT_').cat(date.format('M'))])\
+                     .rename(['AOT_550'])
+               
+               
+        def modis_image(date):
+            """
+            MODIS AOT image for this month (or null)
+            """
+            return ee.Image(\
+                   ee.ImageCollection('MODIS/006/MOD08_M3')\
+                     .filterDate(Atmospheric.round_month(date))\
+                     .first()\
+                     )
+
+        def modis_band(img):
+            return img\
+                   .select(['Aerosol_Optical_Depth_Land_Mean_Mean_550'])\
+                   .divide(1000)\
+                   .rename(['AOT_550'])
+
+        def aerosol_this_month(date):
+            """
+            MODIS AOT original data product for this month (i.e. some data gaps)
+            """
+            # image for this month
+            img = modis_image(date)
+      
+            # fill missing month (?)
+            img = ee.Algorithms.If(img,\
+                               # all good
+                               modis_band(img),\
+                              # missing month
+                                aerosol_fill(date))
+                      
+            return img    
+        
+  
+        def get_AOT(AOT_band,coord):
+            """
+            AOT scalar value for target
+            """  
+            return ee.Image(AOT_band).reduceRegion(reducer=ee.Reducer.mean(),\
+                                     geometry = coord)\
+                                    .get('AOT_550')
+                                
+
+        after_modis_start = date.difference(ee.Date('2000-03-01'),'month').gt(0)
+
+        if not fill:
+            # MODIS product only, no fill branches in the graph
+            img = modis_image(date)
+            measured = ee.Algorithms.If(after_modis_start,ee.Algorithms.If(img,get_AOT(modis_band(img),coord),None),None)
+            if source:
+                return ee.List([measured,ee.Algorithms.If(measured,'MOD08_M3',None)])
+            return measured
+
+        AOT_band = ee.Algorithms.If(after_modis_start, aerosol_this_month(date), aerosol_fill(date))
+
+        AOT = get_AOT(AOT_band,coord)
+
+        AOT = ee.Algorithms.If(AOT,AOT,get_AOT(aerosol_fill(date),coord))
+        # i.e. check reduce region worked (else force fill value)
+
+        if source:
+            img = modis_image(date)
+            measured = ee.Algorithms.If(img,get_AOT(modis_band(img),coord),None)
+            dataset = ee.Algorithms.If(after_modis_start,ee.Algorithms.If(measured,'MOD08_M3','AOT_stack'),'AOT_stack')
+            return ee.List([AOT,dataset])
+
+        return AOT
+
+
+    def altitude(coord):
+        """
+        Target altitude (km) from the SRTM digital elevation model.
+
+        (Jarvis et al., 2008, Hole-filled SRTM for the globe Version 4,
+        CGIAR-CSI SRTM 90m Database)
+
+        SRTM has no data over the ocean, those targets are at sea level.
+        """
+
+        # Shuttle Radar Topography mission covers *most* of the Earth
+        SRTM = ee.Image('CGIAR/SRTM90_V4')
+
+        # elevation at target (m)
+        alt = SRTM.reduceRegion(reducer = ee.Reducer.mean(), geometry = coord).get('elevation')
+
+        # no data (i.e. ocean) is sea level
+        alt = ee.Algorithms.If(alt,alt,0)
+
+        # convert to Py6S units (i.e. kilometers)
+        return ee.Number(alt).divide(1000)
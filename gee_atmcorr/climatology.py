@@ -0,0 +1,157 @@
+"""
+climatology.py
+
+Local snapshot of the ozone and AOT fill climatologies used by atmospheric.py
+
+- users/samsammurphy/public/ozone_fill: mean ozone per day of year and lat/lon
+- users/samsammurphy/public/AOT_stack: mean MODIS AOT per month and lat/lon
+
+snapshot() downloads both once (on a regular lat/lon grid) into .npy files,
+load() memory-maps them. Fill values are then looked up on the client for
+many points at once, and the server graphs only evaluate the measured
+products (Atmospheric.ozone/aerosol with fill=False, see ancillary.fallback).
+
+Usage
+climatology.snapshot('climatology')       # once, ~100 requests at 1 degree
+fills = climatology.load('climatology')
+o3 = fills.ozone([[lon,lat],...],[ms,...]) # Py6S units
+aot = fills.aot([[lon,lat],...],[ms,...])
+"""
+
+import json
+import os
+from . import lazy
+ee = lazy.Module('ee')
+import numpy as np
+
+OZONE_FILL = 'users/samsammurphy/public/ozone_fill'
+AOT_STACK = 'users/samsammurphy/public/AOT_stack'
+
+# grid resolution (degrees)
+STEP = 1.0
+
+# largest number of pixels per request (Image.sampleRectangle limit)
+MAX_PIXELS = 262144
+
+# no data in the snapshot requests
+NO_DATA = -9999
+
+
+def _grid(step):
+    cols = int(round(360 / step))
+    rows = int(round(180 / step))
+    return rows, cols
+
+
+def _sample(image, band, step):
+    # one band on the global grid (server side)
+    return ee.Image(image).select([band]).reproject('EPSG:4326', [step, 0, -180, 0, -step, 90]) \
+        .sampleRectangle(region=ee.Geometry.Rectangle([-180, -90, 180, 90], None, False), defaultValue=NO_DATA)
+
+
+def _download(samples, band, store, offset):
+    # several layers in one request
+    for i, feature in enumerate(ee.List(samples).getInfo()):
+        layer = np.array(feature['properties'][band], dtype=np.float32)
+        layer[layer == NO_DATA] = np.nan
+        store[offset + i] = layer
+
+
+def snapshot(directory, step=STEP):
+    """
+    Download the ozone (366 days) and AOT (12 months) fill climatologies to
+    'directory' (ozone.npy, aot.npy and grid.json). Values are stored as in
+    the assets (ozone in Dobson units, AOT at 550 nm); NaN = no data.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rows, cols = _grid(step)
+    per_request = max(1, MAX_PIXELS // (rows * cols))
+
+    ozone = np.lib.format.open_memmap(os.path.join(directory, 'ozone.npy'), mode='w+',
+                                      dtype=np.float32, shape=(366, rows, cols))
+    fills = ee.ImageCollection(OZONE_FILL).toList(366)
+    for start in range(0, 366, per_request):
+        days = range(start, min(start + per_request, 366))
+        _download([_sample(fills.get(day), 'ozone', step) for day in days], 'ozone', ozone, start)
+    ozone.flush()
+
+    aot = np.lib.format.open_memmap(os.path.join(directory, 'aot.npy'), mode='w+',
+                                    dtype=np.float32, shape=(12, rows, cols))
+    for start in range(0, 12, per_request):
+        months = range(start, min(start + per_request, 12))
+        samples = [_sample(ee.Image(AOT_STACK).select(['AOT_%d' % (m + 1)], ['AOT_550']), 'AOT_550', step)
+                   for m in months]
+        _download(samples, 'AOT_550', aot, start)
+    aot.flush()
+
+    with open(os.path.join(directory, 'grid.json'), 'w') as f:
+        json.dump({'step': step, 'west': -180, 'north': 90, 'rows': rows, 'cols': cols,
+                   'ozone': OZONE_FILL, 'aot': AOT_STACK}, f, indent=1)
+
+    return load(directory)
+
+
+class Climatology():
+    """
+    Memory-mapped fill climatologies (see snapshot)
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'grid.json')) as f:
+            self.grid = json.load(f)
+        self.ozone_fill = np.load(os.path.join(directory, 'ozone.npy'), mmap_mode='r')
+        self.aot_stack = np.load(os.path.join(directory, 'aot.npy'), mmap_mode='r')
+
+    def _cells(self, coords):
+        # nearest grid cell (row, col) of [lon,lat] points
+        coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        step = self.grid['step']
+        cols = np.floor((coords[:, 0] - self.grid['west']) / step).astype(int) % self.grid['cols']
+        rows = np.clip(np.floor((self.grid['north'] - coords[:, 1]) / step).astype(int), 0, self.grid['rows'] - 1)
+        return rows, cols
+
+    def _lookup(self, layers, index, coords):
+        # values at the nearest grid cells; cells without data (NaN, e.g. polar
+        # night or no MODIS retrieval) take the nearest cell with data
+        rows, cols = self._cells(coords)
+        index = np.asarray(index, dtype=int)
+        values = layers[index, rows, cols].astype(float)
+        for i in np.flatnonzero(np.isnan(values)):
+            values[i] = self._nearest(layers[index[i]], rows[i], cols[i])
+        return values
+
+    def _nearest(self, layer, row, col):
+        # nearest valid cell of one layer (longitude wraps, scaled by cos(lat))
+        valid_rows, valid_cols = np.nonzero(~np.isnan(layer))
+        if valid_rows.size == 0:
+            raise ValueError('climatology layer without data')
+        n = self.grid['cols']
+        lat = np.radians(self.grid['north'] - (row + 0.5) * self.grid['step'])
+        dlon = ((valid_cols - col + n // 2) % n - n // 2) * np.cos(lat)
+        nearest = np.argmin((valid_rows - row)**2 + dlon**2)
+        return float(layer[valid_rows[nearest], valid_cols[nearest]])
+
+    def ozone(self, coords, times):
+        """
+        ozone fill (Py6S units, i.e. atm-cm) at [lon,lat] points and times (ms);
+        day of year as in Atmospheric.ozone
+        """
+        times = np.asarray(times, dtype='int64').astype('datetime64[ms]')
+        doy_index = (times - times.astype('datetime64[Y]')) // np.timedelta64(1, 'D')
+        return self._lookup(self.ozone_fill, doy_index, coords) / 1000
+
+    def aot(self, coords, times):
+        """
+        AOT fill at [lon,lat] points and times (ms), for the month of each time
+        (cells without data: nearest cell with data, see _lookup)
+        """
+        times = np.asarray(times, dtype='int64').astype('datetime64[ms]')
+        month_index = times.astype('datetime64[M]').astype(int) % 12
+        return self._lookup(self.aot_stack, month_index, coords)
+
+
+def load(directory):
+    """
+    memory-mapped climatologies of a snapshot directory
+    """
+    return Climatology(directory)
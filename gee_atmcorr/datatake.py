@@ -0,0 +1,136 @@
+"""
+datatake.py
+
+Scenes of the same datatake (Sentinel-2) or orbit pass (Landsat path) are
+acquired minutes apart over adjacent tiles, so their atmosphere and 6S inputs
+are nearly identical. Grouping them resolves the atmospheric constituents (and
+SRTM altitude) once per group in one request, and 6S runs once per band and
+group (see parameters.coefficients) instead of once per tile.
+
+Groups are split into sub-regions: tiles farther than 'tolerance' km (default
+TOLERANCE) from the first tile of a sub-region start a new one, so a long
+datatake does not share one atmosphere across a continent (None = one per group).
+
+Usage
+groups = datatake.group(scenes)                  # scenes from ancillary.prefetch
+groups = datatake.share(scenes,altitude,tolerance=100)   # None = no sub-regions
+output = getBOA.forCollection(collection,mission,bands,imageID,datatake=True)
+"""
+
+import math
+from . import ancillary
+from . import mission_specifics as mn
+
+# longest gap (minutes) between consecutive scenes of one group
+WINDOW = 30
+
+# largest distance (km) of a tile to the first tile of its sub-region
+TOLERANCE = 300
+
+# mean Earth radius (km)
+EARTH_RADIUS = 6371.0
+
+
+def key(properties):
+    """
+    datatake (Sentinel-2) or spacecraft, path and day (Landsat) of a scene
+    """
+    mission = mn.detect_mission(properties)
+    if 'DATATAKE_IDENTIFIER' in properties:
+        return (mission, properties['DATATAKE_IDENTIFIER'])
+    if 'WRS_PATH' in properties:
+        day = properties['system:time_start'] // 86400000
+        return (mission, properties['WRS_PATH'], day)
+    # no identifier: consecutive scenes within WINDOW
+    return (mission,)
+
+
+def distance(a, b):
+    """
+    great circle distance (km) between two [lon,lat] points
+    """
+    lon1, lat1, lon2, lat2 = map(math.radians, [a[0], a[1], b[0], b[1]])
+    h = math.sin((lat2-lat1)/2)**2 + math.cos(lat1)*math.cos(lat2)*math.sin((lon2-lon1)/2)**2
+    return 2 * EARTH_RADIUS * math.asin(min(1, math.sqrt(h)))
+
+
+def group(scenes, window=WINDOW, tolerance=TOLERANCE):
+    """
+    Indices of the scenes of every group (lists, in acquisition order).
+
+    scenes: [{'properties','coordinates'}] (see ancillary.prefetch)
+    window: longest gap (minutes) between consecutive scenes of a group
+    tolerance: largest distance (km) of a tile to the first tile of its
+               sub-region, None = do not split groups spatially
+    """
+    order = sorted(range(len(scenes)), key=lambda i: scenes[i]['properties']['system:time_start'])
+
+    # same datatake/orbit and no gap longer than 'window'
+    passes = {}
+    groups = []
+    for i in order:
+        k = key(scenes[i]['properties'])
+        time = scenes[i]['properties']['system:time_start']
+        if k not in passes or time - passes[k][1] > window * 60000:
+            passes[k] = [[], time]
+            groups.append(passes[k][0])
+        passes[k][0].append(i)
+        passes[k][1] = time
+
+    if tolerance is None:
+        return groups
+
+    # sub-regions
+    regions = []
+    for members in groups:
+        seeds = []
+        for i in members:
+            coord = scenes[i]['coordinates']
+            for seed, region in seeds:
+                if distance(seed, coord) <= tolerance:
+                    region.append(i)
+                    break
+            else:
+                seeds.append((coord, [i]))
+                regions.append(seeds[-1][1])
+
+    return regions
+
+
+def mean_coordinates(coords):
+    """
+    mean [lon,lat] of points; longitudes averaged on the circle, so tiles on
+    both sides of the antimeridian give a mean near +-180, not near 0
+    """
+    lons = [math.radians(c[0]) for c in coords]
+    lon = math.degrees(math.atan2(sum(map(math.sin, lons)), sum(map(math.cos, lons))))
+    return [lon, sum(c[1] for c in coords)/len(coords)]
+
+
+def share(scenes, altitude=None, window=WINDOW, tolerance=TOLERANCE):
+    """
+    Group the scenes and give each group one set of 6S inputs: mean target
+    point, acquisition time and solar zenith angle of its members, stored in
+    scene['atmosphere'] (used by parameters.BOA). The constituents (and SRTM
+    altitudes) of all groups are fetched together, one request per
+    ancillary.BATCH_SIZE groups (see ancillary.fetch). Returns the groups (see group()).
+    """
+    groups = group(scenes, window, tolerance)
+
+    shared = []
+    for members in groups:
+        properties = [scenes[i]['properties'] for i in members]
+        coords = [scenes[i]['coordinates'] for i in members]
+        atmosphere = {
+            'coordinates': mean_coordinates(coords),
+            'system:time_start': int(sum(p['system:time_start'] for p in properties)/len(properties)),
+            'solar_z': sum(mn.solar_z(None, mn.detect_mission(p), p) for p in properties)/len(properties)
+        }
+        for i in members:
+            scenes[i]['atmosphere'] = atmosphere
+        shared.append(atmosphere)
+
+    # warm the caches used by parameters.BOA
+    ancillary.fetch([(a['coordinates'], a['system:time_start']) for a in shared], altitude)
+
+    return groups
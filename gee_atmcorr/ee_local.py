@@ -0,0 +1,1257 @@
+"""
+ee_local.py
+
+Local stand-in for the subset of the Earth Engine API used by this project
+(atmospheric.py, parameters.py, mission_specifics.py and getBOA.py).
+
+Images are small in-memory NumPy rasters and collections are lists of them,
+so the whole correction chain can run without an authenticated 'ee' session.
+Expressions are built lazily, exactly like the real client library, and are
+only evaluated on getInfo(). Every getInfo() counts as one round-trip: the
+backend keeps a call counter and adds a configurable (simulated) latency so
+round-trip optimizations can be measured deterministically.
+
+Usage
+backend = ee_local.install(latency=0.5)   # 'import ee' now returns this module
+ee_local.synthetic_catalog(backend)       # NCEP, TOMS, MODIS, SRTM, fills...
+ee_local.add_scene(backend,'COPERNICUS/S2','20190411T160519_20190411T160516_T17RNH',
+                   datetime.datetime(2019,4,11,16,5),(-82.5,27.0,-82.0,27.5))
+...
+backend.calls     # number of getInfo() round-trips so far
+backend.elapsed   # simulated seconds spent waiting on the server
+ee_local.uninstall()
+"""
+
+import calendar
+import collections
+import datetime
+import hashlib
+import json
+import math
+import re
+import sys
+import time
+
+import numpy as np
+
+
+GLOBAL_BBOX = (-180.0, -90.0, 180.0, 90.0)
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+_BACKEND = None
+_PREVIOUS_EE = None
+
+
+class EEException(Exception):
+    """Raised for anything the real server would reject."""
+
+
+class Backend():
+    """
+    Asset catalog plus round-trip accounting.
+
+    latency: simulated seconds per getInfo() (added to 'elapsed')
+    sleep:   really wait 'latency' seconds on each call (wall-clock benchmarks)
+    """
+
+    def __init__(self, latency=0.0, sleep=False):
+        self.latency = latency
+        self.sleep = sleep
+        self.assets = {}
+        self.reset()
+
+    def reset(self):
+        """
+        zero the call counters (the asset catalog is kept)
+        """
+        self.calls = 0
+        self.elapsed = 0.0
+        self.counts = collections.Counter()
+
+    def add_image(self, asset_id, bands, bbox=GLOBAL_BBOX, properties=None):
+        """
+        register an image asset, bands = {name: 2D array}
+        """
+        raster = _make_raster(bands, bbox, properties)
+        raster.props.setdefault('system:id', asset_id)
+        raster.props.setdefault('system:index', asset_id.split('/')[-1])
+        self.assets[asset_id] = raster
+        return raster
+
+    def add_collection(self, asset_id, images=()):
+        """
+        register an (optionally empty) image collection asset
+        """
+        self.assets[asset_id] = []
+        for image in images:
+            self.add_to_collection(asset_id, image)
+        return self.assets[asset_id]
+
+    def add_to_collection(self, asset_id, raster):
+        """
+        append one raster (see 'raster') to a collection asset
+        """
+        members = self.assets.setdefault(asset_id, [])
+        index = raster.props.setdefault('system:index', str(len(members)))
+        raster.props['system:id'] = asset_id + '/' + index
+        members.append(raster)
+        return raster
+
+    def evaluate(self, obj):
+        """
+        one round-trip: evaluate an expression and return its JSON-like value
+        """
+        self.calls += 1
+        self.counts[obj.func or 'constant'] += 1
+        self.elapsed += self.latency
+        if self.sleep and self.latency:
+            time.sleep(self.latency)
+        return _to_info(_Evaluator(self).evaluate(obj))
+
+
+def install(backend=None, latency=0.0, sleep=False):
+    """
+    Make 'import ee' return this module, backed by 'backend'.
+
+    The project modules look 'ee' up on first use (see lazy.py), so this can
+    follow their import; it must precede their first Earth Engine call.
+    """
+    global _BACKEND, _PREVIOUS_EE
+    if backend is None:
+        backend = Backend(latency=latency, sleep=sleep)
+    _BACKEND = backend
+    if sys.modules.get('ee') is not sys.modules[__name__]:
+        _PREVIOUS_EE = sys.modules.get('ee')
+    sys.modules['ee'] = sys.modules[__name__]
+    return backend
+
+
+def uninstall():
+    """
+    restore whatever 'ee' module was there before install()
+    """
+    global _BACKEND, _PREVIOUS_EE
+    if _PREVIOUS_EE is not None:
+        sys.modules['ee'] = _PREVIOUS_EE
+    else:
+        sys.modules.pop('ee', None)
+    _BACKEND = None
+    _PREVIOUS_EE = None
+
+
+def backend():
+    """
+    the active backend
+    """
+    if _BACKEND is None:
+        raise EEException('ee_local is not installed, call ee_local.install() first')
+    return _BACKEND
+
+
+def Initialize(*args, **kwargs):
+    """
+    no authentication needed locally
+    """
+    backend()
+
+
+# ---------------------------------------------------------------------------
+# Client-side objects (lazy expression graph)
+# ---------------------------------------------------------------------------
+
+class ComputedObject():
+    """
+    A node of the expression graph: a server function name and its arguments.
+    Constants have func = None and keep their python value in 'args'.
+    """
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+
+    @classmethod
+    def _invoke(cls, func, **args):
+        obj = object.__new__(cls)
+        ComputedObject.__init__(obj, func, args)
+        return obj
+
+    def _cast(self, other):
+        ComputedObject.__init__(self, other.func, other.args)
+
+    def getInfo(self):
+        return backend().evaluate(self)
+
+    def serialize(self):
+        return json.dumps(encode(self))
+
+    def __repr__(self):
+        return 'ee.%s(%s)' % (type(self).__name__, self.serialize())
+
+
+class Element(ComputedObject):
+
+    def get(self, prop):
+        return ComputedObject._invoke('Element.get', object=self, property=prop)
+
+    def set(self, *args):
+        if len(args) == 1:
+            return type(self)._invoke('Element.setMulti', object=self, properties=args[0])
+        return type(self)._invoke('Element.set', object=self, key=args[0], value=args[1])
+
+    def propertyNames(self):
+        return List._invoke('Element.propertyNames', element=self)
+
+    def toDictionary(self, properties=None):
+        return Dictionary._invoke('Element.toDictionary', element=self, properties=properties)
+
+
+class Image(Element):
+
+    def __init__(self, image=None):
+        if isinstance(image, ComputedObject):
+            self._cast(image)
+        elif image is None:
+            constant = Image._invoke('Image.constant', value=0)
+            ComputedObject.__init__(self, 'Image.mask', {'image': constant, 'mask': Image._invoke('Image.constant', value=0)})
+        elif isinstance(image, str):
+            ComputedObject.__init__(self, 'Image.load', {'id': image})
+        elif isinstance(image, (int, float)):
+            ComputedObject.__init__(self, 'Image.constant', {'value': image})
+        else:
+            raise EEException('Unrecognized argument type to convert to an Image: %r' % (image,))
+
+    @staticmethod
+    def constant(value):
+        return Image._invoke('Image.constant', value=value)
+
+    def select(self, selectors=None, names=None, *args):
+        if isinstance(selectors, str):
+            selectors = [selectors] + ([names] if names is not None else []) + list(args)
+            names = None
+        return Image._invoke('Image.select', input=self, bandSelectors=selectors, newNames=names)
+
+    def rename(self, names, *args):
+        if isinstance(names, str):
+            names = [names] + list(args)
+        return Image._invoke('Image.rename', input=self, names=names)
+
+    def addBands(self, srcImg, names=None, overwrite=False):
+        return Image._invoke('Image.addBands', dstImg=self, srcImg=srcImg, names=names, overwrite=overwrite)
+
+    def bandNames(self):
+        return List._invoke('Image.bandNames', image=self)
+
+    def _binary(self, name, other):
+        return Image._invoke('Image.' + name, image1=self, image2=other)
+
+    def add(self, other):
+        return self._binary('add', other)
+
+    def subtract(self, other):
+        return self._binary('subtract', other)
+
+    def multiply(self, other):
+        return self._binary('multiply', other)
+
+    def divide(self, other):
+        return self._binary('divide', other)
+
+    def gt(self, other):
+        return self._binary('gt', other)
+
+    def lt(self, other):
+        return self._binary('lt', other)
+
+    def eq(self, other):
+        return self._binary('eq', other)
+
+    def neq(self, other):
+        return self._binary('neq', other)
+
+    def mask(self, mask=None):
+        return Image._invoke('Image.mask', image=self, mask=mask)
+
+    def updateMask(self, mask):
+        return Image._invoke('Image.updateMask', image=self, mask=mask)
+
+    def unmask(self, value=None):
+        return Image._invoke('Image.unmask', input=self, value=value)
+
+    def reduceRegion(self, reducer=None, geometry=None, scale=None, **kwargs):
+        return Dictionary._invoke('Image.reduceRegion', image=self, reducer=reducer, geometry=geometry, scale=scale)
+
+    def geometry(self):
+        return Geometry._invoke('Element.geometry', feature=self)
+
+    def reproject(self, crs, crsTransform=None, scale=None):
+        return Image._invoke('Image.reproject', image=self, crs=crs, crsTransform=crsTransform, scale=scale)
+
+    def sampleRectangle(self, region=None, properties=None, defaultValue=None, defaultArrayValue=None):
+        return Element._invoke('Image.sampleRectangle', image=self, region=region, defaultValue=defaultValue)
+
+
+class ImageCollection(ComputedObject):
+
+    def __init__(self, args):
+        if isinstance(args, str):
+            ComputedObject.__init__(self, 'ImageCollection.load', {'id': args})
+        elif isinstance(args, (list, tuple)):
+            ComputedObject.__init__(self, 'ImageCollection.fromImages', {'images': [Image(i) for i in args]})
+        elif isinstance(args, ImageCollection):
+            self._cast(args)
+        elif isinstance(args, Image):
+            ComputedObject.__init__(self, 'ImageCollection.fromImages', {'images': [args]})
+        elif isinstance(args, ComputedObject):
+            self._cast(args)
+        else:
+            raise EEException('Unrecognized argument type to convert to an ImageCollection: %r' % (args,))
+
+    def filter(self, new_filter):
+        return ImageCollection._invoke('Collection.filter', collection=self, filter=new_filter)
+
+    def filterDate(self, start, end=None):
+        return ImageCollection._invoke('Collection.filterDate', collection=self, start=start, end=end)
+
+    def filterBounds(self, geometry):
+        return ImageCollection._invoke('Collection.filterBounds', collection=self, geometry=geometry)
+
+    def first(self):
+        return Image._invoke('Collection.first', collection=self)
+
+    def toList(self, count, offset=None):
+        return List._invoke('Collection.toList', collection=self, count=count, offset=offset)
+
+    def size(self):
+        return Number._invoke('Collection.size', collection=self)
+
+    def merge(self, collection2):
+        return ImageCollection._invoke('Collection.merge', collection1=self, collection2=collection2)
+
+    def sort(self, prop, ascending=True):
+        return ImageCollection._invoke('Collection.limit', collection=self, key=prop, ascending=ascending)
+
+    def aggregate_array(self, prop):
+        return List._invoke('AggregateFeatureCollection.array', collection=self, property=prop)
+
+
+class List(ComputedObject):
+
+    def __init__(self, arg):
+        if isinstance(arg, ComputedObject):
+            self._cast(arg)
+        else:
+            ComputedObject.__init__(self, None, list(arg))
+
+    def get(self, index):
+        return ComputedObject._invoke('List.get', list=self, index=index)
+
+    def size(self):
+        return Number._invoke('List.size', list=self)
+
+    def remove(self, element):
+        return List._invoke('List.remove', list=self, element=element)
+
+
+class Dictionary(ComputedObject):
+
+    def __init__(self, arg=None):
+        if isinstance(arg, ComputedObject):
+            self._cast(arg)
+        else:
+            ComputedObject.__init__(self, None, dict(arg or {}))
+
+    def get(self, key, defaultValue=None):
+        return ComputedObject._invoke('Dictionary.get', dictionary=self, key=key, defaultValue=defaultValue)
+
+
+class Number(ComputedObject):
+
+    def __init__(self, number):
+        if isinstance(number, ComputedObject):
+            self._cast(number)
+        else:
+            ComputedObject.__init__(self, None, number)
+
+    def _binary(self, name, other):
+        return Number._invoke('Number.' + name, left=self, right=other)
+
+    def _unary(self, name):
+        return Number._invoke('Number.' + name, input=self)
+
+    def add(self, other):
+        return self._binary('add', other)
+
+    def subtract(self, other):
+        return self._binary('subtract', other)
+
+    def multiply(self, other):
+        return self._binary('multiply', other)
+
+    def divide(self, other):
+        return self._binary('divide', other)
+
+    def gt(self, other):
+        return self._binary('gt', other)
+
+    def lt(self, other):
+        return self._binary('lt', other)
+
+    def eq(self, other):
+        return self._binary('eq', other)
+
+    def round(self):
+        return self._unary('round')
+
+    def abs(self):
+        return self._unary('abs')
+
+    def toInt(self):
+        return self._unary('toInt')
+
+
+class String(ComputedObject):
+
+    def __init__(self, string):
+        if isinstance(string, ComputedObject):
+            self._cast(string)
+        else:
+            ComputedObject.__init__(self, None, str(string))
+
+    def cat(self, string2):
+        return String._invoke('String.cat', string1=self, string2=string2)
+
+
+class Date(ComputedObject):
+
+    def __init__(self, date, tz=None):
+        if isinstance(date, Date):
+            self._cast(date)
+        elif isinstance(date, datetime.datetime):
+            ComputedObject.__init__(self, 'Date', {'value': _datetime_to_millis(date)})
+        else:
+            ComputedObject.__init__(self, 'Date', {'value': date})
+
+    @staticmethod
+    def fromYMD(year, month, day):
+        return Date._invoke('Date.fromYMD', year=year, month=month, day=day)
+
+    def get(self, unit):
+        return Number._invoke('Date.get', date=self, unit=unit)
+
+    def advance(self, delta, unit):
+        return Date._invoke('Date.advance', date=self, delta=delta, unit=unit)
+
+    def difference(self, start, unit):
+        return Number._invoke('Date.difference', date=self, start=start, unit=unit)
+
+    def format(self, format=None):
+        return String._invoke('Date.format', date=self, format=format)
+
+    def millis(self):
+        return Number._invoke('Date.millis', input=self)
+
+
+class DateRange(ComputedObject):
+
+    def __init__(self, start, end=None):
+        ComputedObject.__init__(self, 'DateRange', {'start': start, 'end': end})
+
+    def contains(self, other):
+        return ComputedObject._invoke('DateRange.contains', dateRange=self, other=other)
+
+
+class Geometry(ComputedObject):
+
+    def __init__(self, geo_json):
+        if isinstance(geo_json, ComputedObject):
+            self._cast(geo_json)
+        else:
+            ComputedObject.__init__(self, 'GeometryConstructors.' + geo_json['type'], {'coordinates': geo_json['coordinates']})
+
+    @staticmethod
+    def Point(coords, *args):
+        if not isinstance(coords, (list, tuple)):
+            coords = [coords] + list(args)
+        return Geometry._invoke('GeometryConstructors.Point', coordinates=list(coords))
+
+    @staticmethod
+    def Rectangle(coords, *args):
+        if not isinstance(coords, (list, tuple)):
+            coords = [coords] + list(args)
+        return Geometry._invoke('GeometryConstructors.Rectangle', coordinates=list(coords))
+
+    def buffer(self, distance):
+        return Geometry._invoke('Geometry.buffer', geometry=self, distance=distance)
+
+    def centroid(self, maxError=None):
+        return Geometry._invoke('Geometry.centroid', geometry=self)
+
+    def bounds(self):
+        return Geometry._invoke('Geometry.bounds', geometry=self)
+
+
+class Reducer(ComputedObject):
+
+    @staticmethod
+    def mean():
+        return Reducer._invoke('Reducer.mean')
+
+
+class Filter(ComputedObject):
+
+    @staticmethod
+    def lt(name, value):
+        return Filter._invoke('Filter.lessThan', leftField=name, rightValue=value)
+
+    @staticmethod
+    def gt(name, value):
+        return Filter._invoke('Filter.greaterThan', leftField=name, rightValue=value)
+
+    @staticmethod
+    def eq(name, value):
+        return Filter._invoke('Filter.equals', leftField=name, rightValue=value)
+
+    @staticmethod
+    def inList(name, values):
+        return Filter._invoke('Filter.inList', leftField=name, rightValue=values)
+
+    @staticmethod
+    def And(*filters):
+        return Filter._invoke('Filter.and', filters=list(filters))
+
+
+class Algorithms():
+
+    @staticmethod
+    def If(condition=None, trueCase=None, falseCase=None):
+        return ComputedObject._invoke('Algorithms.If', condition=condition, trueCase=trueCase, falseCase=falseCase)
+
+
+# ---------------------------------------------------------------------------
+# Serialization (same layout as the cloud API: {'result': ..., 'values': ...})
+# ---------------------------------------------------------------------------
+
+def encode(obj):
+    """
+    Serialize an expression to the cloud API expression format.
+    Identical sub-expressions are stored once and referenced by key.
+    """
+    values = {}
+    keys = {}
+
+    def encode_value(value):
+        if isinstance(value, ComputedObject):
+            if value.func is None:
+                return encode_value(value.args)
+            arguments = {k: encode_value(v) for k, v in sorted(value.args.items()) if v is not None}
+            node = {'functionInvocationValue': {'functionName': value.func, 'arguments': arguments}}
+            digest = json.dumps(node, sort_keys=True)
+            if digest not in keys:
+                keys[digest] = str(len(keys))
+                values[keys[digest]] = node
+            return {'valueReference': keys[digest]}
+        if isinstance(value, (list, tuple)):
+            return {'arrayValue': {'values': [encode_value(v) for v in value]}}
+        if isinstance(value, dict):
+            return {'dictionaryValue': {'values': {k: encode_value(v) for k, v in sorted(value.items())}}}
+        if isinstance(value, np.generic):
+            value = value.item()
+        return {'constantValue': value}
+
+    result = encode_value(obj)
+    if 'valueReference' not in result:
+        # plain list/dict root: stored under a fresh key
+        key = str(len(keys))
+        values[key] = result
+        result = {'valueReference': key}
+    return {'result': result['valueReference'], 'values': values}
+
+
+def fingerprint(obj):
+    """
+    sha256 of the serialized expression (stable across sessions)
+    """
+    return hashlib.sha256(json.dumps(encode(obj), sort_keys=True).encode('utf-8')).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Server-side values
+# ---------------------------------------------------------------------------
+
+class _Band():
+
+    def __init__(self, name, data, mask):
+        self.name = name
+        self.data = data
+        self.mask = mask
+
+
+class _Raster():
+    """
+    evaluated Image: bands on a regular lon/lat grid covering 'bbox'
+    """
+
+    def __init__(self, bands, bbox, props):
+        self.bands = bands
+        self.bbox = tuple(bbox)
+        self.props = props
+
+    def copy(self, bands=None, props=None):
+        return _Raster(self.bands if bands is None else bands, self.bbox,
+                       dict(self.props) if props is None else props)
+
+
+class _Collection(list):
+    """
+    evaluated ImageCollection (a plain list is an ee.List)
+    """
+
+
+class _DateValue():
+
+    def __init__(self, millis):
+        self.millis = int(millis)
+
+    @property
+    def datetime(self):
+        return _EPOCH + datetime.timedelta(milliseconds=self.millis)
+
+
+class _DateRangeValue():
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class _GeometryValue():
+
+    def __init__(self, type, coordinates):
+        self.type = type
+        self.coordinates = coordinates
+
+    @property
+    def bbox(self):
+        if self.type == 'Point':
+            lon, lat = self.coordinates
+            return (lon, lat, lon, lat)
+        ring = self.coordinates[0]
+        lons = [c[0] for c in ring]
+        lats = [c[1] for c in ring]
+        return (min(lons), min(lats), max(lons), max(lats))
+
+
+def _polygon(bbox):
+    w, s, e, n = bbox
+    return _GeometryValue('Polygon', [[[w, s], [e, s], [e, n], [w, n], [w, s]]])
+
+
+def _make_raster(bands, bbox=GLOBAL_BBOX, properties=None):
+    made = []
+    for name, data in bands.items():
+        data = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        made.append(_Band(name, data, ~np.isnan(data)))
+    return _Raster(made, bbox, dict(properties or {}))
+
+
+def raster(bands, bbox=GLOBAL_BBOX, properties=None):
+    """
+    build an image for Backend.add_to_collection (NaN pixels are masked)
+    """
+    return _make_raster(bands, bbox, properties)
+
+
+def _datetime_to_millis(value):
+    return int(round((value - _EPOCH).total_seconds() * 1000))
+
+
+def _millis(value):
+    if isinstance(value, _DateValue):
+        return value.millis
+    if isinstance(value, (int, float, np.number)):
+        return int(value)
+    if isinstance(value, str):
+        return _datetime_to_millis(datetime.datetime.fromisoformat(value.replace('Z', '')))
+    if isinstance(value, datetime.datetime):
+        return _datetime_to_millis(value)
+    raise EEException('Date: Invalid date value %r' % (value,))
+
+
+def _advance(millis, delta, unit):
+    date = _EPOCH + datetime.timedelta(milliseconds=millis)
+    unit = unit.rstrip('s')
+    if unit in ('year', 'month'):
+        months = int(round(delta)) * (12 if unit == 'year' else 1)
+        month0 = date.month - 1 + months
+        year = date.year + month0 // 12
+        month = month0 % 12 + 1
+        day = min(date.day, calendar.monthrange(year, month)[1])
+        return _datetime_to_millis(date.replace(year=year, month=month, day=day))
+    seconds = {'week': 604800, 'day': 86400, 'hour': 3600, 'minute': 60, 'second': 1}[unit]
+    return millis + int(round(delta * seconds * 1000))
+
+
+def _difference(end, start, unit):
+    days = (end - start) / 86400000.0
+    unit = unit.rstrip('s')
+    per_day = {'year': 1 / 365.25, 'month': 12 / 365.25, 'week': 1 / 7.0, 'day': 1.0,
+               'hour': 24.0, 'minute': 1440.0, 'second': 86400.0}
+    return days * per_day[unit]
+
+
+def _format(millis, pattern):
+    date = _EPOCH + datetime.timedelta(milliseconds=millis)
+    if pattern is None:
+        return date.strftime('%Y-%m-%dT%H:%M:%S')
+    fields = {'y': date.year, 'Y': date.year, 'M': date.month, 'd': date.day,
+              'H': date.hour, 'm': date.minute, 's': date.second, 'D': date.timetuple().tm_yday}
+    out = []
+    for token in re.findall(r"(([a-zA-Z])\2*|[^a-zA-Z]+)", pattern):
+        text = token[0]
+        if text[0] in fields:
+            out.append(str(fields[text[0]]).zfill(len(text)))
+        else:
+            out.append(text)
+    return ''.join(out)
+
+
+def _pixel_values(band, bbox, geometry):
+    """
+    unmasked pixel values of 'band' (on grid 'bbox') that fall in 'geometry'
+    """
+    w, s, e, n = bbox
+    rows, cols = band.data.shape
+    gw, gs, ge, gn = geometry.bbox
+    if geometry.type == 'Point':
+        if gw < w or gw > e or gs < s or gs > n:
+            return np.empty(0)
+        col = min(int((gw - w) / (e - w) * cols), cols - 1)
+        row = min(int((n - gs) / (n - s) * rows), rows - 1)
+        if band.mask[row, col]:
+            return band.data[row, col:col + 1]
+        return np.empty(0)
+    lon = w + (np.arange(cols) + 0.5) * (e - w) / cols
+    lat = n - (np.arange(rows) + 0.5) * (n - s) / rows
+    inside = np.outer((lat >= gs) & (lat <= gn), (lon >= gw) & (lon <= ge))
+    if not inside.any():
+        # region smaller than one pixel: use the pixel under its centre
+        centre = _GeometryValue('Point', [(gw + ge) / 2.0, (gs + gn) / 2.0])
+        return _pixel_values(band, bbox, centre)
+    return band.data[inside & band.mask]
+
+
+def _image_operand(value):
+    if isinstance(value, _Raster):
+        return value
+    return _Raster([_Band('constant', np.full((1, 1), float(value)), np.ones((1, 1), bool))], GLOBAL_BBOX, {})
+
+
+def _pair_bands(left, right):
+    if len(right.bands) == 1:
+        return [(b, right.bands[0]) for b in left.bands]
+    if len(left.bands) == 1:
+        return [(left.bands[0], b) for b in right.bands]
+    if len(left.bands) != len(right.bands):
+        raise EEException('Image: images must contain the same number of bands or only 1 band. Got %d and %d.'
+                          % (len(left.bands), len(right.bands)))
+    return list(zip(left.bands, right.bands))
+
+
+def _image_binary(op):
+
+    def apply(image1, image2):
+        left, right = _image_operand(image1), _image_operand(image2)
+        if left.bbox == GLOBAL_BBOX and right.bbox != GLOBAL_BBOX:
+            bbox = right.bbox
+        else:
+            bbox = left.bbox
+        bands = []
+        for a, b in _pair_bands(left, right):
+            name = a.name if len(left.bands) >= len(right.bands) else b.name
+            with np.errstate(divide='ignore', invalid='ignore'):
+                data = np.asarray(op(a.data, b.data), dtype=np.float64)
+            mask = np.broadcast_to(a.mask & b.mask, data.shape) & np.isfinite(data)
+            bands.append(_Band(name, data, mask))
+        # band math drops the image properties, as on the server
+        return _Raster(bands, bbox, {})
+
+    return apply
+
+
+def _number_binary(op):
+
+    def apply(left, right):
+        if left is None or right is None:
+            raise EEException('Number: Parameter is required.')
+        return op(left, right)
+
+    return apply
+
+
+def _truthy(value):
+    if value is None:
+        return False
+    if isinstance(value, (bool, int, float, np.number)):
+        return bool(value)
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def _select(input, bandSelectors, newNames=None):
+    selected = []
+    for selector in bandSelectors:
+        if isinstance(selector, int):
+            selected.append(input.bands[selector])
+            continue
+        matches = [b for b in input.bands if re.fullmatch(selector, b.name)]
+        if not matches:
+            raise EEException("Image.select: Pattern '%s' did not match any bands." % selector)
+        selected.extend(matches)
+    if newNames is not None:
+        selected = [_Band(n, b.data, b.mask) for b, n in zip(selected, newNames)]
+    return input.copy(bands=selected)
+
+
+def _rename(input, names):
+    if len(names) != len(input.bands):
+        raise EEException('Image.rename: The number of names (%d) must match the number of bands (%d).'
+                          % (len(names), len(input.bands)))
+    return input.copy(bands=[_Band(n, b.data, b.mask) for b, n in zip(input.bands, names)])
+
+
+def _add_bands(dstImg, srcImg, names=None, overwrite=False):
+    src = srcImg.bands
+    if names is not None:
+        src = [b for b in src if b.name in names]
+    existing = [b.name for b in dstImg.bands]
+    clash = [b.name for b in src if b.name in existing]
+    if clash and not overwrite:
+        raise EEException('Image.addBands: Image already contains a band named %s.' % clash[0])
+    bands = [b for b in dstImg.bands if b.name not in clash] + list(src)
+    bbox = srcImg.bbox if dstImg.bbox == GLOBAL_BBOX else dstImg.bbox
+    return _Raster(bands, bbox, dict(dstImg.props))
+
+
+def _set_mask(image, mask, update):
+    mask = _image_operand(mask)
+    bands = []
+    for b, m in _pair_bands(image, mask):
+        new = np.broadcast_to((m.data != 0) & m.mask, b.data.shape)
+        bands.append(_Band(b.name, b.data, (b.mask & new) if update else new.copy()))
+    return image.copy(bands=bands)
+
+
+def _mask(image, mask=None):
+    if mask is None:
+        return image.copy(bands=[_Band(b.name, b.mask.astype(np.float64), np.ones_like(b.mask)) for b in image.bands])
+    return _set_mask(image, mask, update=False)
+
+
+def _unmask(input, value=None):
+    fill = 0.0 if value is None else value
+    bands = []
+    for b in input.bands:
+        data = np.where(b.mask, b.data, fill)
+        bands.append(_Band(b.name, data, np.ones(data.shape, bool)))
+    return input.copy(bands=bands)
+
+
+def _reduce_region(image, reducer, geometry=None, scale=None):
+    if reducer != 'mean':
+        raise EEException('Image.reduceRegion: only Reducer.mean() is emulated.')
+    if geometry is None:
+        geometry = _polygon(image.bbox)
+    result = {}
+    for b in image.bands:
+        values = _pixel_values(b, image.bbox, geometry)
+        result[b.name] = float(values.mean()) if values.size else None
+    return result
+
+
+def _reproject(image, crs, crsTransform=None, scale=None):
+    # nearest neighbour resampling to a global EPSG:4326 grid of crsTransform
+    # [xScale, 0, west, 0, -yScale, north] (the only case emulated)
+    if crs != 'EPSG:4326' or crsTransform is None:
+        raise EEException('Image.reproject: only EPSG:4326 with a crsTransform is emulated.')
+    step_x, _, west, _, step_y, north = crsTransform
+    cols = int(round((GLOBAL_BBOX[2] - west) / step_x))
+    rows = int(round((north - GLOBAL_BBOX[1]) / -step_y))
+    lon = west + (np.arange(cols) + 0.5) * step_x
+    lat = north + (np.arange(rows) + 0.5) * step_y
+    bands = []
+    for b in image.bands:
+        w, s, e, n = image.bbox
+        src_rows, src_cols = b.data.shape
+        col = np.clip(((lon - w) / (e - w) * src_cols).astype(int), 0, src_cols - 1)
+        row = np.clip(((n - lat) / (n - s) * src_rows).astype(int), 0, src_rows - 1)
+        inside = np.outer((lat >= s) & (lat <= n), (lon >= w) & (lon <= e))
+        data = b.data[np.ix_(row, col)]
+        mask = b.mask[np.ix_(row, col)] & inside
+        bands.append(_Band(b.name, data, mask))
+    return _Raster(bands, (west, north + rows * step_y, west + cols * step_x, north), image.props)
+
+
+def _sample_rectangle(image, region=None, defaultValue=None):
+    # band values of the pixels whose centres fall in 'region' (rows from north to south)
+    gw, gs, ge, gn = (region or _polygon(image.bbox)).bbox
+    w, s, e, n = image.bbox
+    properties = dict(image.props)
+    for b in image.bands:
+        rows, cols = b.data.shape
+        lon = w + (np.arange(cols) + 0.5) * (e - w) / cols
+        lat = n - (np.arange(rows) + 0.5) * (n - s) / rows
+        keep_rows = (lat >= gs) & (lat <= gn)
+        keep_cols = (lon >= gw) & (lon <= ge)
+        data = b.data[np.ix_(keep_rows, keep_cols)]
+        mask = b.mask[np.ix_(keep_rows, keep_cols)]
+        if not mask.all() and defaultValue is None:
+            raise EEException('Image.sampleRectangle: Masked pixels and no defaultValue.')
+        properties[b.name] = np.where(mask, data, defaultValue if defaultValue is not None else 0).tolist()
+    return {'type': 'Feature', 'geometry': _to_info(_polygon((gw, gs, ge, gn))), 'properties': properties}
+
+
+def _buffer(geometry, distance):
+    w, s, e, n = geometry.bbox
+    dlat = distance / 111320.0
+    dlon = dlat / max(math.cos(math.radians((s + n) / 2.0)), 1e-6)
+    return _polygon((w - dlon, s - dlat, e + dlon, n + dlat))
+
+
+def _centroid(geometry):
+    w, s, e, n = geometry.bbox
+    return _GeometryValue('Point', [(w + e) / 2.0, (s + n) / 2.0])
+
+
+def _load_collection(backend, id):
+    members = backend.assets.get(id)
+    if not isinstance(members, list):
+        raise EEException("ImageCollection.load: ImageCollection asset '%s' not found." % id)
+    return _Collection(members)
+
+
+def _load_image(backend, id):
+    asset = backend.assets.get(id)
+    if isinstance(asset, _Raster):
+        return asset.copy()
+    parent, _, index = id.rpartition('/')
+    for raster in backend.assets.get(parent, None) or []:
+        if raster.props.get('system:index') == index:
+            return raster.copy()
+    raise EEException("Image.load: Image asset '%s' not found." % id)
+
+
+def _filter_predicate(spec):
+    kind, field, value = spec
+    tests = {
+        'lessThan': lambda v: v is not None and v < value,
+        'greaterThan': lambda v: v is not None and v > value,
+        'equals': lambda v: v == value,
+        'inList': lambda v: v in value,
+    }
+    test = tests[kind]
+    return lambda props: test(props.get(field))
+
+
+def _filter_date(collection, start, end=None):
+    start = _millis(start)
+    end = start + 1 if end is None else _millis(end)
+    return _Collection(r for r in collection if start <= r.props.get('system:time_start', -1) < end)
+
+
+def _filter_bounds(collection, geometry):
+    gw, gs, ge, gn = geometry.bbox
+    out = _Collection()
+    for r in collection:
+        w, s, e, n = r.bbox
+        if w <= ge and gw <= e and s <= gn and gs <= n:
+            out.append(r)
+    return out
+
+
+def _list_get(list, index):
+    index = int(index)
+    if not -len(list) <= index < len(list):
+        raise EEException('List.get: List index must be between %d and %d. Found %d.'
+                          % (-len(list), len(list) - 1, index))
+    return list[index]
+
+
+def _date_get(date, unit):
+    value = _EPOCH + datetime.timedelta(milliseconds=_millis(date))
+    if unit == 'dayOfYear':
+        return value.timetuple().tm_yday
+    return getattr(value, unit)
+
+
+def _list_remove(list, element):
+    out = [v for v in list]
+    if element in out:
+        out.remove(element)
+    return out
+
+
+_FUNCTIONS = {
+    'Image.load': None,  # needs the backend, see _Evaluator
+    'ImageCollection.load': None,
+    'Image.constant': lambda value: _image_operand(value),
+    'Image.select': _select,
+    'Image.rename': _rename,
+    'Image.addBands': _add_bands,
+    'Image.bandNames': lambda image: [b.name for b in image.bands],
+    'Image.add': _image_binary(np.add),
+    'Image.subtract': _image_binary(np.subtract),
+    'Image.multiply': _image_binary(np.multiply),
+    'Image.divide': _image_binary(np.divide),
+    'Image.gt': _image_binary(lambda a, b: (a > b).astype(np.float64)),
+    'Image.lt': _image_binary(lambda a, b: (a < b).astype(np.float64)),
+    'Image.eq': _image_binary(lambda a, b: (a == b).astype(np.float64)),
+    'Image.neq': _image_binary(lambda a, b: (a != b).astype(np.float64)),
+    'Image.mask': _mask,
+    'Image.updateMask': lambda image, mask: _set_mask(image, mask, update=True),
+    'Image.unmask': _unmask,
+    'Image.reduceRegion': _reduce_region,
+    'Image.reproject': _reproject,
+    'Image.sampleRectangle': _sample_rectangle,
+    'Element.geometry': lambda feature: _polygon(feature.bbox),
+    'Element.get': lambda object, property: object.props.get(property),
+    'Element.set': lambda object, key, value: object.copy(props=dict(object.props, **{key: value})),
+    'Element.setMulti': lambda object, properties: object.copy(props=dict(object.props, **properties)),
+    'Element.propertyNames': lambda element: list(element.props),
+    'Element.toDictionary': lambda element, properties=None: {
+        k: v for k, v in element.props.items() if properties is None or k in properties},
+    'ImageCollection.fromImages': lambda images: _Collection(images),
+    'Collection.filter': lambda collection, filter: _Collection(r for r in collection if filter(r.props)),
+    'Collection.filterDate': _filter_date,
+    'Collection.filterBounds': _filter_bounds,
+    'Collection.first': lambda collection: collection[0] if collection else None,
+    'Collection.toList': lambda collection, count, offset=None: list(collection[int(offset or 0):int(offset or 0) + int(count)]),
+    'Collection.size': lambda collection: len(collection),
+    'Collection.merge': lambda collection1, collection2: _Collection(list(collection1) + list(collection2)),
+    'Collection.limit': lambda collection, key, ascending=True: _Collection(sorted(
+        collection, key=lambda r: r.props.get(key), reverse=not ascending)),
+    'AggregateFeatureCollection.array': lambda collection, property: [r.props.get(property) for r in collection],
+    'List.get': _list_get,
+    'List.size': lambda list: len(list),
+    'List.remove': _list_remove,
+    'Dictionary.get': lambda dictionary, key, defaultValue=None: dictionary.get(key, defaultValue),
+    'Number.add': _number_binary(lambda a, b: a + b),
+    'Number.subtract': _number_binary(lambda a, b: a - b),
+    'Number.multiply': _number_binary(lambda a, b: a * b),
+    'Number.divide': _number_binary(lambda a, b: a / b if b else 0),
+    'Number.gt': _number_binary(lambda a, b: int(a > b)),
+    'Number.lt': _number_binary(lambda a, b: int(a < b)),
+    'Number.eq': _number_binary(lambda a, b: int(a == b)),
+    'Number.round': lambda input: float(math.floor(input + 0.5)),
+    'Number.abs': lambda input: abs(input),
+    'Number.toInt': lambda input: int(input),
+    'String.cat': lambda string1, string2: string1 + string2,
+    'Date': lambda value: _DateValue(_millis(value)),
+    'Date.fromYMD': lambda year, month, day: _DateValue(_datetime_to_millis(
+        datetime.datetime(int(year), int(month), int(day)))),
+    'Date.get': _date_get,
+    'Date.advance': lambda date, delta, unit: _DateValue(_advance(_millis(date), delta, unit)),
+    'Date.difference': lambda date, start, unit: _difference(_millis(date), _millis(start), unit),
+    'Date.format': lambda date, format=None: _format(_millis(date), format),
+    'Date.millis': lambda input: _millis(input),
+    'DateRange': lambda start, end=None: _DateRangeValue(
+        _millis(start), _millis(end) if end is not None else _millis(start) + 1),
+    'DateRange.contains': lambda dateRange, other: int(dateRange.start <= _millis(other) < dateRange.end),
+    'GeometryConstructors.Point': lambda coordinates: _GeometryValue('Point', list(coordinates)),
+    'GeometryConstructors.Rectangle': lambda coordinates: _polygon(coordinates),
+    'GeometryConstructors.Polygon': lambda coordinates: _GeometryValue('Polygon', coordinates),
+    'Geometry.buffer': _buffer,
+    'Geometry.centroid': _centroid,
+    'Geometry.bounds': lambda geometry: _polygon(geometry.bbox),
+    'Reducer.mean': lambda: 'mean',
+    'Filter.lessThan': lambda leftField, rightValue: _filter_predicate(('lessThan', leftField, rightValue)),
+    'Filter.greaterThan': lambda leftField, rightValue: _filter_predicate(('greaterThan', leftField, rightValue)),
+    'Filter.equals': lambda leftField, rightValue: _filter_predicate(('equals', leftField, rightValue)),
+    'Filter.inList': lambda leftField, rightValue: _filter_predicate(('inList', leftField, rightValue)),
+    'Filter.and': lambda filters: (lambda props: all(f(props) for f in filters)),
+}
+
+
+class _Evaluator():
+    """
+    evaluates one expression graph (shared sub-expressions are computed once)
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.memo = {}
+
+    def evaluate(self, value):
+        if isinstance(value, ComputedObject):
+            if value.func is None:
+                return self.evaluate(value.args)
+            key = id(value)
+            if key not in self.memo:
+                self.memo[key] = (value, self.invoke(value.func, value.args))
+            return self.memo[key][1]
+        if isinstance(value, (list, tuple)):
+            return [self.evaluate(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.evaluate(v) for k, v in value.items()}
+        return value
+
+    def invoke(self, func, args):
+        if func == 'Algorithms.If':
+            # only the selected branch is evaluated, as on the server
+            branch = 'trueCase' if _truthy(self.evaluate(args['condition'])) else 'falseCase'
+            return self.evaluate(args[branch])
+        if func not in _FUNCTIONS:
+            raise EEException('Unknown algorithm: %s (not emulated by ee_local)' % func)
+        kwargs = {k: self.evaluate(v) for k, v in args.items() if v is not None}
+        if func == 'Image.load':
+            return _load_image(self.backend, kwargs['id'])
+        if func == 'ImageCollection.load':
+            return _load_collection(self.backend, kwargs['id'])
+        for name, arg in kwargs.items():
+            if arg is None and func.startswith(('Image.', 'Element.', 'Collection.')):
+                raise EEException('%s, argument \'%s\': Invalid type. Expected type: Object. Actual type: null.'
+                                  % (func, name))
+        return _FUNCTIONS[func](**kwargs)
+
+
+def _to_info(value):
+    if isinstance(value, _Raster):
+        bands = [{'id': b.name, 'data_type': {'type': 'PixelType', 'precision': 'double'},
+                  'dimensions': [b.data.shape[1], b.data.shape[0]]} for b in value.bands]
+        return {'type': 'Image', 'bands': bands, 'properties': _to_info(value.props)}
+    if isinstance(value, _DateValue):
+        return {'type': 'Date', 'value': value.millis}
+    if isinstance(value, _DateRangeValue):
+        return {'type': 'DateRange', 'dates': [value.start, value.end]}
+    if isinstance(value, _GeometryValue):
+        return {'type': value.type, 'coordinates': value.coordinates}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, _Collection):
+        return {'type': 'ImageCollection', 'features': [_to_info(v) for v in value]}
+    if isinstance(value, list):
+        return [_to_info(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_info(v) for k, v in value.items()}
+    if callable(value):
+        return {'type': 'Filter'}
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Synthetic catalog
+# ---------------------------------------------------------------------------
+
+# lon/lat field used by all synthetic datasets: smooth, deterministic and
+# different at every grid point so that spatial lookups can be checked
+def _field(shape, base, amplitude, phase=0.0):
+    rows, cols = shape
+    lat = np.linspace(1, -1, rows)[:, None]
+    lon = np.linspace(-1, 1, cols)[None, :]
+    return base + amplitude * np.cos(np.pi * lat / 2) * (1 + 0.25 * np.sin(np.pi * lon + phase))
+
+
+def synthetic_catalog(backend, start=datetime.datetime(2019, 1, 1), end=datetime.datetime(2020, 1, 1),
+                      shape=(18, 36)):
+    """
+    Register every ancillary asset used by atmospheric.py and parameters.py
+    with smooth, deterministic global fields between 'start' and 'end'.
+    """
+    def timestamp(date):
+        return _datetime_to_millis(date)
+
+    # NCEP water vapour (kg/m^2), 6-hourly
+    ncep = []
+    date = start
+    while date < end:
+        phase = date.timetuple().tm_yday / 58.0 + date.hour / 24.0
+        ncep.append(raster({'pr_wtr': _field(shape, 5.0, 40.0, phase)}, GLOBAL_BBOX,
+                           {'system:index': date.strftime('%Y%m%d%H'), 'system:time_start': timestamp(date)}))
+        date += datetime.timedelta(hours=6)
+    backend.add_collection('NCEP_RE/surface_wv', ncep)
+
+    # TOMS/OMI ozone (Dobson units), daily
+    toms = []
+    date = start
+    while date < end:
+        phase = date.timetuple().tm_yday / 58.0
+        toms.append(raster({'ozone': _field(shape, 250.0, 80.0, phase)}, GLOBAL_BBOX,
+                           {'system:index': date.strftime('%Y%m%d'), 'system:time_start': timestamp(date)}))
+        date += datetime.timedelta(days=1)
+    backend.add_collection('TOMS/MERGED', toms)
+
+    # ozone fill climatology: one image per day of year
+    fills = []
+    for doy in range(366):
+        fills.append(raster({'ozone': _field(shape, 260.0, 60.0, doy / 58.0)}, GLOBAL_BBOX,
+                            {'system:index': str(doy + 1), 'system:time_start': timestamp(
+                                datetime.datetime(2000, 1, 1) + datetime.timedelta(days=doy))}))
+    backend.add_collection('users/samsammurphy/public/ozone_fill', fills)
+
+    # MODIS monthly AOT (scaled by 1000), first of each month
+    modis = []
+    date = datetime.datetime(start.year, start.month, 1)
+    while date < end:
+        modis.append(raster({'Aerosol_Optical_Depth_Land_Mean_Mean_550': _field(shape, 50.0, 150.0, date.month)},
+                            GLOBAL_BBOX, {'system:index': date.strftime('%Y_%m_%d'),
+                                          'system:time_start': timestamp(date)}))
+        date = _EPOCH + datetime.timedelta(milliseconds=_advance(timestamp(date), 1, 'month'))
+    backend.add_collection('MODIS/006/MOD08_M3', modis)
+
+    # AOT fill stack: one band per month
+    backend.add_image('users/samsammurphy/public/AOT_stack',
+                      {'AOT_%d' % m: _field(shape, 0.08, 0.15, m) for m in range(1, 13)})
+
+    # elevation (m)
+    backend.add_image('CGIAR/SRTM90_V4', {'elevation': np.clip(_field(shape, -800.0, 2000.0), 0, None)})
+
+    return backend
+
+
+_SCENES = {
+    'COPERNICUS/S2': {
+        'bands': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8', 'B8A', 'B9', 'B10', 'B11', 'B12', 'QA60'],
+        'scale': 10000.0,
+    },
+    'LANDSAT/LC08/C01/T1_TOA': {
+        'bands': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'B8', 'B9', 'B10', 'B11', 'BQA'],
+        'scale': 1.0,
+    },
+    'LANDSAT/LE07/C01/T1_TOA': {
+        'bands': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6_VCID_1', 'B6_VCID_2', 'B7', 'B8', 'BQA'],
+        'scale': 1.0,
+    },
+    'LANDSAT/LT05/C01/T1_TOA': {'bands': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'BQA'], 'scale': 1.0},
+    'LANDSAT/LT04/C01/T1_TOA': {'bands': ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7', 'BQA'], 'scale': 1.0},
+}
+
+_S2_ESUN = {'B1': 1884.69, 'B2': 1959.66, 'B3': 1823.24, 'B4': 1512.06, 'B5': 1424.64, 'B6': 1287.61,
+            'B7': 1162.08, 'B8': 1041.63, 'B8A': 955.32, 'B9': 812.92, 'B10': 367.15, 'B11': 245.59,
+            'B12': 85.25}
+
+
+def add_scene(backend, collection_id, index, date, bbox, shape=(8, 8), properties=None):
+    """
+    Add a synthetic TOA scene to one of the mission collections with the
+    metadata that mission_specifics.py reads for it.
+    """
+    template = _SCENES[collection_id]
+    bands = {}
+    for i, name in enumerate(template['bands']):
+        if name in ('QA60', 'BQA'):
+            bands[name] = np.zeros(shape)
+        else:
+            bands[name] = _field(shape, 0.02, 0.1 / (1 + i % 5), i) * template['scale']
+    props = {'system:index': index, 'system:time_start': _datetime_to_millis(date)}
+    if collection_id == 'COPERNICUS/S2':
+        props.update({'SPACECRAFT_NAME': 'Sentinel-2A', 'MEAN_SOLAR_ZENITH_ANGLE': 35.0,
+                      'CLOUDY_PIXEL_PERCENTAGE': 5.0, 'MGRS_TILE': index.split('_')[-1][1:],
+                      'DATATAKE_IDENTIFIER': 'GS2A_%s_000000_N02.07' % date.strftime('%Y%m%dT%H%M%S')})
+        props.update({'SOLAR_IRRADIANCE_' + b: v for b, v in _S2_ESUN.items()})
+    else:
+        path_row = index.split('_')[1]
+        props.update({'SPACECRAFT_ID': 'LANDSAT_' + collection_id.split('/')[1][-1], 'SUN_ELEVATION': 55.0,
+                      'CLOUD_COVER': 5.0, 'WRS_PATH': int(path_row[:3]), 'WRS_ROW': int(path_row[3:])})
+    props.update(properties or {})
+    return backend.add_to_collection(collection_id, raster(bands, bbox, props))
@@ -0,0 +1,98 @@
+"""
+elevation.py
+
+Target altitude for the 6S model.
+
+Coastal and oceanic targets are at sea level (the default). Inland lakes and
+rivers need the SRTM elevation, which is looked up for all targets in a single
+getInfo() and cached by location, so inland corrections cost the same number
+of round-trips as coastal ones.
+
+Usage
+km = elevation.resolve(altitude,coord)           # None, km or 'SRTM'
+kms = elevation.target_altitudes([[lon,lat],...]) # one request for all points
+"""
+
+from . import lazy
+ee = lazy.Module('ee')
+from .atmospheric import Atmospheric
+from . import infocache
+
+# 1 m, i.e. the target altitude used for coastal water
+SEA_LEVEL = 0.001
+
+# cache resolution in decimal degrees (~100 m, about one SRTM pixel)
+PRECISION = 3
+
+_cache = {}
+
+
+def location_key(coord):
+    """
+    cache key of a [lon,lat] point
+    """
+    return (round(coord[0],PRECISION), round(coord[1],PRECISION))
+
+
+def centroid(image):
+    """
+    target point of an image (same as parameters.BOA)
+    """
+    return ee.Image(image).geometry().buffer(10).centroid()
+
+
+def _clamp(km):
+    # Py6S writes negative altitudes as pressures, keep targets at/above sea level
+    return max(km, SEA_LEVEL)
+
+
+def target_altitudes(coords):
+    """
+    SRTM altitude (km) at each [lon,lat] point.
+    Points that are not cached yet are fetched together in one request.
+    """
+    missing = []
+    for coord in coords:
+        key = location_key(coord)
+        if key not in _cache and key not in missing:
+            missing.append(key)
+
+    if missing:
+        kms = infocache.getInfo(ee.List([Atmospheric.altitude(ee.Geometry.Point(list(key))) for key in missing]))
+        for key, km in zip(missing, kms):
+            _cache[key] = _clamp(km)
+
+    return [_cache[location_key(coord)] for coord in coords]
+
+
+def store(coord, km):
+    """
+    cache an altitude (km) fetched elsewhere (e.g. ancillary.prefetch, which
+    fetches the SRTM altitude of every scene with its metadata)
+    """
+    _cache[location_key(coord)] = _clamp(km)
+    return _cache[location_key(coord)]
+
+
+def resolve(altitude, coord):
+    """
+    Target altitude (km) for the 6S model:
+
+    None   -> sea level (coastal/oceanic targets)
+    number -> user defined altitude in km
+    'SRTM' -> elevation at 'coord' (inland targets)
+    """
+    if altitude is None:
+        return SEA_LEVEL
+    if isinstance(altitude, str):
+        if altitude.upper() != 'SRTM':
+            raise ValueError("altitude must be None, a number (km) or 'SRTM', got: " + altitude)
+        return target_altitudes([coord])[0]
+    return _clamp(float(altitude))
+
+
+def clear_cache():
+    """
+    forget all cached altitudes
+    """
+    _cache.clear()
@@ -0,0 +1,191 @@
+"""
+Function to apply atmospheric correction to
+a predefine set of bands.
+By Luis Lizcano-Sandoval
+09/02/2021
+"""
+from . import lazy
+ee = lazy.Module('ee')
+from . import mission_specifics as mn
+from . import ancillary
+from . import datatake as dt
+from . import infocache
+from .parameters import BOA, calibration
+
+## The collection, mission, bands AND imageID arguments are defined in the main script.
+## altitude: None (sea level, coastal/oceanic targets), km, or 'SRTM' for inland targets.
+## datatake: share atmosphere and 6S runs among the tiles of a datatake/orbit pass (see datatake.py),
+## split into sub-regions of 'tolerance' km (default datatake.TOLERANCE, None = one per datatake).
+
+## The function *positive* will convert any negative value to 0.0001 in all bands.
+## For Sentinel-2, the bands B1,B2,B3,B4 are more susceptible to present negative
+## values in very dark/coastal areas. I have compared those areas using Sentinel-2 L2A
+## images and it seems they do the same: dark areas showing default minimum valid pixel
+## values of 0.0001.
+def positive(band):
+    ## If there are masked areas, unmask them and assign a specific pixel value different from 0.0001.
+    ## Sometimes Sentinel-2 tiles present cut off corners.
+    unmasked = band.unmask(9999)
+
+    ## Take all the positive pixel values and assing 0.0001 values to all negative ones.
+    b = unmasked.gt(0)
+    b_mask = unmasked.mask(b)
+    b_unmasked = b_mask.unmask(0.0001)
+
+    ## Re-mask the areas with 9999 values
+    remask = b_unmasked.neq(9999)
+
+    return ee.Image(b_unmasked).mask(remask)
+
+
+def correct(img, mission, bands, scene, altitude=None, harmonize=False, thermal=True):
+    ## Surface reflectance of one prefetched scene (see ancillary.prefetch) plus its
+    ## thermal (Landsat, unless thermal=False) and QA bands. mission is a key of
+    ## mission_specifics.SENSORS.
+    ## harmonize renames the bands to common names (blue, green, ..., thermal, QA).
+    sensor = mn.SENSORS[mission]
+    thermal = thermal and sensor.thermal_band is not None
+
+    ## Create an empty image. It will have a band called 'constant' that is removed below.
+    output = ee.Image()
+
+    ## Spectral response functions and radiance factors of all bands at once
+    calibrated = calibration(img, mission, bands, scene['properties'])
+
+    for band, cal in zip(bands, calibrated):
+        ## Get BOA reflectance for the respective band.
+        b = BOA(mission, img, band, altitude, scene, cal)
+
+        ## Getting all the bands together
+        output = output.addBands(positive(b))
+
+    ## Remove the 'constant' band. This line is adding significant time to the processing...
+    output = output.select(output.bandNames().remove('constant'))
+
+    ## Add thermal band if this is a Landsat image, and the QA band
+    extra = [sensor.thermal_band, sensor.qa_band] if thermal else [sensor.qa_band]
+    output = output.addBands(img.select(extra))
+
+    if harmonize:
+        names = [sensor.common_bands[i] for i in sensor.indices(bands)]
+        names += ['thermal', 'QA'] if thermal else ['QA']
+        output = output.rename(names)
+
+    ## Copy properties from the original image
+    output = output.set(img.toDictionary(img.propertyNames()))
+
+    return output
+
+
+def prefetch(images, altitude=None, datatake=False, tolerance=dt.TOLERANCE):
+    ## Metadata, atmosphere (and SRTM altitude) of every scene in a single request.
+    ## By datatake: metadata first, then the atmosphere of each group.
+    if not datatake:
+        return ancillary.prefetch(images, altitude)
+
+    scenes = ancillary.prefetch(images, altitude, atmosphere=False)
+    groups = dt.share(scenes, altitude, tolerance=tolerance)
+    print('Datatakes:', len(groups), 'groups for', len(scenes), 'images')
+    return scenes
+
+
+def forCollection(collection, mission, bands, imageID, altitude=None, datatake=False, tolerance=dt.TOLERANCE):
+    List = collection.toList(collection.size())
+    Size = infocache.getInfo(List.size())
+    images = [ee.Image(mn.eeCollection(mission) + '/'+ get) for get in imageID[:Size]]
+
+    scenes = prefetch(images, altitude, datatake, tolerance)
+
+    outputs = []
+    for i in range(Size):
+        print('Processing Image '+str(i+1)+':', scenes[i]['properties']['system:index'])
+
+        ## Sentinel-2A or Sentinel-2B (Landsat missions are the same as 'mission')
+        mission2 = mn.detect_mission(scenes[i]['properties'])
+        if 'Sentinel' in mission:
+            print('Mission: ', mission2)
+
+        outputs.append(correct(images[i], mission2, bands, scenes[i], altitude))
+        print('Done!')
+
+    return ee.ImageCollection(outputs)
+
+
+def forImage(img, mission, bands, altitude=None):
+
+    print('Working...')
+    ## Metadata, atmosphere (and SRTM altitude) in a single request
+    scene = ancillary.prefetch([img], altitude)[0]
+
+    ## Sentinel-2A or Sentinel-2B (Landsat missions are the same as 'mission')
+    mission2 = mn.detect_mission(scene['properties'])
+    if 'Sentinel' in mission:
+        print('Mission: ', mission2)
+
+    output = correct(img, mission2, bands, scene, altitude)
+
+    #print('Processed Image '+str(i)+':', output.getInfo()['properties']['system:index'])
+    print('Done!')
+
+    return output
+
+
+def shared_bands(missions):
+    ## Common band names (blue, green, ...) present in every sensor of 'missions'
+    missions = sorted(missions)
+    if not missions:
+        return []
+    names = mn.SENSORS[missions[0]].common_bands
+    return [name for name in names if all(name in mn.SENSORS[m].common_bands for m in missions)]
+
+
+def forMixedCollection(collection, bands=None, altitude=None, harmonize=True, datatake=False, tolerance=dt.TOLERANCE):
+    ## Collection mixing Landsat 4/5/7/8 and Sentinel-2A/2B scenes (e.g. merged collections).
+    ## The sensor of each scene is detected from its metadata, scenes are processed grouped
+    ## by sensor and the output collection is in acquisition order.
+    ## bands: None, a list for all sensors, or {mission: list}. None is the bands shared by all
+    ## detected sensors (e.g. blue, green, red, nir, swir1, swir2) if harmonize, else the default
+    ## bands of each sensor.
+    ## harmonize: common band names (blue, green, ...); with bands=None all outputs have the
+    ## same bands (thermal only if every detected sensor has one).
+    Size = infocache.getInfo(collection.size())
+    if Size == 0:
+        return ee.ImageCollection([])
+    List = collection.toList(Size)
+    images = [ee.Image(List.get(i)) for i in range(Size)]
+
+    scenes = prefetch(images, altitude, datatake, tolerance)
+
+    groups = {}
+    for i in range(Size):
+        groups.setdefault(mn.detect_mission(scenes[i]['properties']), []).append(i)
+
+    if harmonize:
+        common = shared_bands(groups)
+        thermal = all(mn.SENSORS[mission].thermal_band for mission in groups)
+    else:
+        thermal = True
+
+    outputs = {}
+    for mission, members in groups.items():
+        print('Mission: ', mission, '('+str(len(members))+' images)')
+        sensor = mn.SENSORS[mission]
+        if bands is None and harmonize:
+            missionBands = [sensor.ee_bands[sensor.common_bands.index(name)] for name in common]
+        elif bands is None:
+            missionBands = sensor.default_bands
+        elif isinstance(bands, dict):
+            missionBands = bands[mission]
+        else:
+            missionBands = bands
+
+        for i in members:
+            print('Processing Image:', scenes[i]['properties']['system:index'])
+            output = correct(images[i], mission, missionBands, scenes[i], altitude, harmonize, thermal)
+            outputs[i] = output.set('MISSION', mission)
+
+    ## Single output stream in acquisition order
+    order = sorted(range(Size), key=lambda i: scenes[i]['properties']['system:time_start'])
+    print('Done!')
+
+    return ee.ImageCollection([outputs[i] for i in order])
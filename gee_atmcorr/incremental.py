@@ -0,0 +1,287 @@
+"""
+incremental.py
+
+Near-real-time mode: poll a mission/AOI for new acquisitions and correct and
+export only those, instead of rerunning getBOA.forCollection over an ID list.
+
+- scenes are selected like in the notebooks: AOI, sunAngleFilter and a cloud
+  cover threshold, newer than the high-water mark (latest corrected
+  acquisition) persisted in a JSON state file
+- scenes ingested late (acquired before the mark) are still picked up within
+  'lookback' hours; corrected IDs in that window are kept in the state file
+- the worker threads and the caches (constituents, altitudes, 6S runs) stay
+  alive between polls
+- latency of every scene (acquisition -> detection -> export submitted) is
+  kept in Monitor.metrics and optionally appended to a JSON lines file
+
+Usage
+monitor = incremental.Monitor('Sentinel2',aoi,'state.json',export=incremental.to_asset(folder))
+monitor.run(interval=900)    # or monitor.poll() from a scheduler
+print(incremental.summary(monitor.metrics))
+
+python -m gee_atmcorr.incremental --mission Sentinel2 --aoi -82.8 27.3 -82.4 27.9 --state state.json --asset users/me/BOA
+"""
+
+import collections
+import concurrent.futures
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+from . import lazy
+ee = lazy.Module('ee')
+from . import mission_specifics as mn
+from . import datatake as dt
+from . import getBOA
+from . import infocache
+
+# seconds between polls
+INTERVAL = 900
+
+# hours before the high-water mark that are searched again for late ingestions
+LOOKBACK = 72
+
+# longest wait (s) after consecutive failed polls
+MAX_BACKOFF = 6 * 3600
+
+# one scene: IDs and times (s since epoch) of acquisition, detection and export submission
+SceneLatency = collections.namedtuple('SceneLatency', ['id', 'mission', 'acquired', 'detected', 'submitted', 'error'])
+
+
+def to_asset(folder, description='BOA_'):
+    """
+    export function: one Earth Engine asset per scene in 'folder' (an existing
+    ImageCollection/folder), at the finest resolution of the corrected bands
+    """
+    def export(output, scene, mission, bands):
+        imgID = scene['properties']['system:index']
+        sensor = mn.SENSORS[mission]
+        task = ee.batch.Export.image.toAsset(
+            image = ee.Image(output),
+            description = description + imgID,
+            assetId = folder + '/' + imgID + '_BOA',
+            region = ee.Image(output).geometry().buffer(10),
+            maxPixels = 1e9,
+            scale = float(sensor.resolution[sensor.indices(bands)].min()))
+        task.start()
+        return task
+    return export
+
+
+def load_state(path):
+    """
+    high-water mark (ms) and recently corrected IDs ({id: time_start}) of a state file
+    """
+    if not os.path.exists(path):
+        return {'high_water': None, 'done': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path):
+    # write-and-rename, a crash never leaves a truncated state file
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class Monitor():
+    """
+    Incremental correction of new scenes of one mission over an AOI.
+
+    mission: 'Sentinel2' or a Landsat mission (see mission_specifics.eeCollection)
+    aoi: ee.Geometry
+    state: path of the JSON state file (high-water mark)
+    export: function(output, scene, mission, bands) called for every corrected
+            scene, e.g. to_asset(folder); None only builds the outputs
+    cloud: largest cloud cover (%) of the scenes
+    start: time (ms or 'YYYY-MM-DD') of the first scene if there is no state yet
+    bands: None (default bands of the sensor) or list
+    altitude, datatake, tolerance: see getBOA.forCollection
+    workers: threads correcting scenes (6S runs are external processes)
+    metrics: path of a JSON lines file for the per-scene latencies (optional)
+    """
+
+    def __init__(self, mission, aoi, state, export=None, cloud=20, start=None, bands=None,
+                 altitude=None, datatake=False, tolerance=dt.TOLERANCE, workers=4, lookback=LOOKBACK, metrics=None):
+        self.mission = mission
+        self.aoi = aoi
+        self.path = state
+        self.export = export
+        self.cloud = cloud
+        self.start = start
+        self.bands = bands
+        self.altitude = altitude
+        self.datatake = datatake
+        self.tolerance = tolerance
+        self.lookback = lookback
+        self.metrics_path = metrics
+        self.metrics = []
+        self.state = load_state(state)
+        self.pool = concurrent.futures.ThreadPoolExecutor(workers)
+        self._lock = threading.Lock()
+
+    def query(self):
+        """
+        collection of candidate scenes: AOI, sun angle, cloud cover and newer
+        than the high-water mark minus the lookback window
+        """
+        # same filters for Sentinel-2A and 2B
+        key = 'Sentinel-2A' if self.mission == 'Sentinel2' else self.mission
+        collection = ee.ImageCollection(mn.eeCollection(self.mission)) \
+            .filterBounds(self.aoi) \
+            .filter(mn.sunAngleFilter(key)) \
+            .filter(ee.Filter.lt(mn.cloud_cover(key)[0], self.cloud))
+
+        if self.state['high_water'] is not None:
+            since = self.state['high_water'] - int(self.lookback * 3600000)
+        elif self.start is not None:
+            since = ee.Date(self.start).millis()
+        else:
+            return collection
+        return collection.filter(ee.Filter.gt('system:time_start', since))
+
+    def pending(self):
+        """
+        IDs of the scenes to correct (one request)
+        """
+        ids = infocache.getInfo(self.query().aggregate_array('system:index'), volatile=True)
+        return [i for i in ids if i not in self.state['done']]
+
+    def _correct(self, image, scene, detected):
+        mission = mn.detect_mission(scene['properties'])
+        bands = self.bands or mn.SENSORS[mission].default_bands
+        error = None
+        try:
+            output = getBOA.correct(image, mission, bands, scene, self.altitude)
+            if self.export is not None:
+                self.export(output, scene, mission, bands)
+        except Exception as e:
+            error = repr(e)
+        latency = SceneLatency(scene['properties']['system:index'], mission,
+                               scene['properties']['system:time_start']/1000, detected, time.time(), error)
+        self._record(latency)
+        return latency
+
+    def _record(self, latency):
+        with self._lock:
+            self.metrics.append(latency)
+            if self.metrics_path:
+                with open(self.metrics_path, 'a') as f:
+                    f.write(json.dumps(latency._asdict()) + '\n')
+
+    def poll(self):
+        """
+        Correct (and export) the new scenes, then advance the high-water mark.
+        Returns the SceneLatency of every scene of this poll.
+        """
+        detected = time.time()
+        ids = self.pending()
+        if not ids:
+            return []
+
+        # metadata and atmosphere of all new scenes in one request (caches stay warm between polls)
+        images = [ee.Image(mn.eeCollection(self.mission) + '/' + i) for i in ids]
+        scenes = getBOA.prefetch(images, self.altitude, self.datatake, self.tolerance)
+
+        futures = [self.pool.submit(self._correct, image, scene, detected) for image, scene in zip(images, scenes)]
+        latencies = [future.result() for future in futures]
+
+        # failed scenes are not marked, they are retried while within the lookback window
+        done = self.state['done']
+        for scene, latency in zip(scenes, latencies):
+            if latency.error is None:
+                done[latency.id] = scene['properties']['system:time_start']
+        if done:
+            self.state['high_water'] = max(done.values())
+            oldest = self.state['high_water'] - int(self.lookback * 3600000)
+            self.state['done'] = {i: t for i, t in done.items() if t >= oldest}
+        save_state(self.state, self.path)
+
+        return latencies
+
+    def run(self, interval=INTERVAL, polls=None):
+        """
+        poll every 'interval' seconds ('polls' times, None = until interrupted).
+        A failed poll (e.g. Earth Engine unavailable) is reported and retried
+        after a wait that doubles with every consecutive failure (up to MAX_BACKOFF).
+        """
+        count = 0
+        failures = 0
+        try:
+            while polls is None or count < polls:
+                started = time.time()
+                wait = interval
+                try:
+                    for latency in self.poll():
+                        print('Scene', latency.id, 'latency %.1f h' % ((latency.submitted - latency.acquired)/3600),
+                              'ERROR ' + latency.error if latency.error else '')
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    wait = min(interval * 2 ** (failures - 1), max(interval, MAX_BACKOFF))
+                    print('Poll failed:', repr(e), '- retrying in %.0f s' % wait, file=sys.stderr)
+                count += 1
+                if polls is None or count < polls:
+                    time.sleep(max(0, wait - (time.time() - started)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def summary(metrics):
+    """
+    median and maximum latencies (hours) of SceneLatency records:
+    detection (acquisition -> poll), processing (poll -> export submitted), total
+    """
+    ok = [m for m in metrics if m.error is None]
+    result = {'scenes': len(ok), 'errors': len(metrics) - len(ok)}
+    if ok:
+        for name, values in [('detection', [m.detected - m.acquired for m in ok]),
+                             ('processing', [m.submitted - m.detected for m in ok]),
+                             ('total', [m.submitted - m.acquired for m in ok])]:
+            result[name] = {'median': statistics.median(values)/3600, 'max': max(values)/3600}
+    return result
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Correct and export new acquisitions as they appear.')
+    parser.add_argument('--mission', required=True, help='Sentinel2, Landsat8, Landsat7, ...')
+    parser.add_argument('--aoi', required=True, type=float, nargs=4, metavar=('W', 'S', 'E', 'N'))
+    parser.add_argument('--state', required=True, help='JSON state file (high-water mark)')
+    parser.add_argument('--asset', required=True, help='destination asset folder/ImageCollection')
+    parser.add_argument('--start', help='first date (YYYY-MM-DD) when there is no state yet')
+    parser.add_argument('--cloud', type=float, default=20, help='largest cloud cover (%%)')
+    parser.add_argument('--altitude', help="target altitude in km, or SRTM (default: sea level)")
+    parser.add_argument('--datatake', action='store_true', help='share atmosphere among tiles of a datatake')
+    parser.add_argument('--tolerance', type=float, default=dt.TOLERANCE,
+                        help='largest distance (km) of tiles sharing atmosphere with --datatake (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--interval', type=float, default=INTERVAL, help='seconds between polls')
+    parser.add_argument('--metrics', help='JSON lines file for per-scene latencies')
+    args = parser.parse_args(argv)
+
+    altitude = args.altitude
+    if altitude is not None and altitude.upper() != 'SRTM':
+        altitude = float(altitude)
+
+    ee.Initialize()
+    monitor = Monitor(args.mission, ee.Geometry.Rectangle(args.aoi), args.state, to_asset(args.asset),
+                      cloud=args.cloud, start=args.start, altitude=altitude, datatake=args.datatake,
+                      tolerance=args.tolerance, workers=args.workers, metrics=args.metrics)
+    monitor.run(args.interval)
+    print(json.dumps(summary(monitor.metrics), indent=1))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
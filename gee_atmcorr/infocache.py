@@ -0,0 +1,188 @@
+"""
+infocache.py
+
+Content-addressed cache of getInfo() results.
+
+Most blocking requests of this project evaluate expressions that only depend
+on fixed assets (image metadata, centroids, constituents of a date, SRTM). The
+result of such an expression is stored under the sha256 of its serialized
+graph, so repeat runs, retries and notebook re-executions skip the request.
+
+- the store is SQLite (a file shared by processes, or in memory), bounded in
+  size: expired entries go first, then the least recently used
+- entries expire after 'ttl' seconds (datasets such as NCEP or TOMS are
+  updated after the fact), per call or per store
+- volatile expressions (e.g. the scenes of a growing collection) are passed
+  with volatile=True, or excluded for good with exclude()
+
+The cache is off until configure() is called (or the GEE_ATMCORR_CACHE
+environment variable names a file); getInfo() then is a plain obj.getInfo().
+
+Usage
+infocache.configure('getinfo.sqlite',max_bytes=64*2**20,ttl=86400)
+info = infocache.getInfo(image)                       # instead of image.getInfo()
+n = infocache.getInfo(collection.size(),volatile=True) # never cached
+infocache.exclude(lambda serialized: 'ImageCollection.load' in serialized)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# store size (bytes of the JSON results)
+MAX_BYTES = 64 * 2**20
+
+# seconds an entry is valid
+TTL = 24 * 3600
+
+_store = None
+_excluded = []
+
+
+class _Store():
+    """
+    SQLite table of JSON results: key, value, size, expiry and last use
+    """
+
+    def __init__(self, path, max_bytes, ttl):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, '
+                         'size INTEGER, expires REAL, used REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT value FROM results WHERE key = ? AND expires > ?', (key, now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute('UPDATE results SET used = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def put(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if len(value) > self.max_bytes:
+                # larger than the whole cache: not stored (and an older value is stale)
+                self._db.execute('DELETE FROM results WHERE key = ?', (key,))
+                return
+            self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                             (key, value, len(value), expires, now))
+            self._evict(now)
+
+    def _evict(self, now):
+        # expired entries first, then the least recently used ones
+        size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if size <= self.max_bytes:
+            return
+        self._db.execute('DELETE FROM results WHERE expires <= ?', (now,))
+        size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        for key, entry in self._db.execute('SELECT key, size FROM results ORDER BY used').fetchall():
+            if size <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM results WHERE key = ?', (key,))
+            size -= entry
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM results')
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        return {'path': self.path, 'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        self._db.close()
+
+
+def configure(path=':memory:', max_bytes=MAX_BYTES, ttl=TTL):
+    """
+    Turn the cache on. path: SQLite file (shared by processes) or ':memory:'
+    """
+    global _store
+    disable()
+    _store = _Store(path, max_bytes, ttl)
+    return _store
+
+
+def disable():
+    """
+    turn the cache off (the store file is kept)
+    """
+    global _store
+    if _store is not None:
+        _store.close()
+    _store = None
+
+
+def exclude(predicate):
+    """
+    never cache expressions whose serialized graph (a JSON string) satisfies
+    predicate(serialized)
+    """
+    _excluded.append(predicate)
+
+
+def key(serialized):
+    """
+    cache key of a serialized expression
+    """
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def getInfo(obj, ttl=None, volatile=False):
+    """
+    obj.getInfo(), from the cache when the same expression was evaluated
+    before (and has not expired).
+
+    ttl: seconds this result is valid (default: the store's)
+    volatile: always evaluate and do not store the result
+    """
+    if _store is None or volatile:
+        return obj.getInfo()
+
+    serialized = obj.serialize()
+    if any(predicate(serialized) for predicate in _excluded):
+        return obj.getInfo()
+
+    digest = key(serialized)
+    value = _store.get(digest)
+    if value is not None:
+        return json.loads(value)
+
+    info = obj.getInfo()
+    _store.put(digest, json.dumps(info), ttl)
+    return info
+
+
+def clear():
+    """
+    remove all stored results
+    """
+    if _store is not None:
+        _store.clear()
+
+
+def stats():
+    """
+    entries, size, hits and misses of the store (None if the cache is off)
+    """
+    return None if _store is None else _store.stats()
+
+
+if os.environ.get('GEE_ATMCORR_CACHE'):
+    configure(os.environ['GEE_ATMCORR_CACHE'])
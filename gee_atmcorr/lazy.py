@@ -0,0 +1,31 @@
+"""
+lazy.py
+
+Modules imported on first use.
+
+'ee' (and its Google API client stack) takes most of the start-up time of a
+worker process. Modules of this project bind it lazily so that importing them
+is cheap; the real import happens on the first attribute access (ee.Image...).
+Because 'ee' is looked up in sys.modules on every access, installing the local
+emulator (ee_local.install) at any time before the first use also works.
+
+Usage
+ee = lazy.Module('ee')
+"""
+
+import importlib
+
+
+class Module():
+    """
+    stand-in for a module that is imported on first attribute access
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self):
+        return "<lazy module '%s'>" % self._name
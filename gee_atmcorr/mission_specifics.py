@@ -0,0 +1,289 @@
+"""
+mission_specifics.py, Sam Murphy (2017-06-28)
+
+Information on satellite missions stored here (e.g. wavebands, etc.)
+
+Modified by Luis Lizcano-Sandoval
+College of Marine Science, University of South Florida
+09-28-2020
+"""
+
+import collections
+import types
+
+from . import lazy
+ee = lazy.Module('ee')
+import numpy as np
+from . import infocache
+
+
+class Sensor(collections.namedtuple('Sensor', ['mission', 'py6s_sensor', 'collection',
+                                               'ee_bands', 'py6s_bands', 'common_bands',
+                                               'srf', 'esun', 'resolution',
+                                               'default_bands', 'qa_band', 'thermal_band'])):
+    """
+    Band tables of one mission (built once, see SENSORS).
+
+    collection: Earth Engine TOA collection (see eeCollection)
+    srf: Py6S PredefinedWavelengths names, one per band
+    esun: exoatmospheric irradiance per band (None = per-scene metadata)
+    resolution: pixel size (m) per band
+    default_bands: bands corrected by default
+    qa_band, thermal_band: copied to the output uncorrected (None = no band)
+    """
+    __slots__ = ()
+
+    def indices(self, bands):
+        """
+        positions of 'bands' in the band tables
+        """
+        return np.array([self.ee_bands.index(b) for b in bands], dtype=int)
+
+
+def _array(values):
+    array = np.array(values, dtype=float)
+    array.flags.writeable = False
+    return array
+
+
+def _sensor(mission, py6s_sensor, collection, ee_bands, common_bands, srf, esun, resolution,
+            default_bands, qa_band, thermal_band):
+    return Sensor(mission, py6s_sensor, collection,
+                  tuple(ee_bands), tuple(ee_bands), tuple(common_bands), tuple(srf),
+                  None if esun is None else _array(esun), _array(resolution),
+                  tuple(default_bands), qa_band, thermal_band)
+
+
+_S2_BANDS = ['B1','B2','B3','B4','B5','B6','B7','B8','B8A','B9','B10','B11','B12']
+_S2_COMMON = ['aerosol','blue','green','red','redEdge1','redEdge2','redEdge3','nir','redEdge4',
+              'waterVapour','cirrus','swir1','swir2']
+_S2_SRF = ['01','02','03','04','05','06','07','08','8A','09','10','11','12']
+_S2_RES = [60,10,10,10,20,20,20,10,20,60,60,20,20]
+
+_TM_BANDS = ['B1','B2','B3','B4','B5','B7']
+_TM_COMMON = ['blue','green','red','nir','swir1','swir2']
+
+_S2_DEFAULT = ['B1','B2','B3','B4','B5','B8','B11','B12']
+
+# ESUN references: see esun
+SENSORS = types.MappingProxyType({
+    'Sentinel-2A': _sensor('Sentinel-2A', 'S2A_MSI', 'COPERNICUS/S2', _S2_BANDS, _S2_COMMON,
+                           ['S2A_MSI_' + b for b in _S2_SRF], None, _S2_RES,
+                           _S2_DEFAULT, 'QA60', None),
+    'Sentinel-2B': _sensor('Sentinel-2B', 'S2B_MSI', 'COPERNICUS/S2', _S2_BANDS, _S2_COMMON,
+                           ['S2B_MSI_' + b for b in _S2_SRF], None, _S2_RES,
+                           _S2_DEFAULT, 'QA60', None),
+    'Landsat8': _sensor('Landsat8', 'LANDSAT_OLI', 'LANDSAT/LC08/C01/T1_TOA',
+                        ['B1','B2','B3','B4','B5','B6','B7','B8','B9'],
+                        ['aerosol','blue','green','red','nir','swir1','swir2','pan','cirrus'],
+                        ['LANDSAT_OLI_B%d' % b for b in range(1,10)],
+                        [1895.33,2004.57,1820.75,1549.49,951.76,247.55,85.46,1723.8,366.97],
+                        [30,30,30,30,30,30,30,15,30],
+                        ['B1','B2','B3','B4','B5','B6','B7'], 'BQA', 'B10'),
+    'Landsat7': _sensor('Landsat7', 'LANDSAT_ETM', 'LANDSAT/LE07/C01/T1_TOA', _TM_BANDS, _TM_COMMON,
+                        ['LANDSAT_ETM_' + b for b in _TM_BANDS],
+                        [1997,1812,1533,1039,230.8,84.9], # PAN =  1362 (removed to match Py6S)
+                        [30,30,30,30,30,30],
+                        _TM_BANDS, 'BQA', 'B6_VCID_1'),
+    'Landsat5': _sensor('Landsat5', 'LANDSAT_TM', 'LANDSAT/LT05/C01/T1_TOA', _TM_BANDS, _TM_COMMON,
+                        ['LANDSAT_TM_' + b for b in _TM_BANDS],
+                        [1983,1796,1536,1031,220,83.44],
+                        [30,30,30,30,30,30],
+                        _TM_BANDS, 'BQA', 'B6'),
+    'Landsat4': _sensor('Landsat4', 'LANDSAT_TM', 'LANDSAT/LT04/C01/T1_TOA', _TM_BANDS, _TM_COMMON,
+                        ['LANDSAT_TM_' + b for b in _TM_BANDS],
+                        [1983,1795,1539,1028,219.8,83.49],
+                        [30,30,30,30,30,30],
+                        _TM_BANDS, 'BQA', 'B6'),
+})
+
+# mission names of the collections with several sensors
+_ALIASES = {'Sentinel2': 'Sentinel-2A'}
+
+
+def detect_mission(properties):
+    """
+    satellite mission (SENSORS key) from image metadata
+    """
+
+    # Sentinel-2: 'Sentinel-2A' or 'Sentinel-2B'
+    if 'SPACECRAFT_NAME' in properties:
+        return properties['SPACECRAFT_NAME']
+
+    # Landsat: 'LANDSAT_8', 'LANDSAT_7', etc.
+    return 'Landsat' + properties['SPACECRAFT_ID'].split('_')[-1]
+
+def ee_bandnames(mission):
+    """
+    visible to short-wave infrared wavebands (EarthEngine nomenclature)
+
+    notes:
+    [1] skipped Landsat7 'PAN' to fit Py6S
+    [2] thermal bands in L7, L5 & L4 are not used in Py6S.
+    """
+
+    return list(SENSORS[mission].ee_bands)
+
+def py6s_bandnames(mission):
+    """
+    visible to short-wave infrared wavebands (Py6S nomenclature)
+
+    notes: 
+    [1] Landsat8 'B8' === 'PAN'
+    [2] Landsat7 'PAN' is missing?
+
+    """
+
+    return list(SENSORS[mission].py6s_bands)
+
+def common_bandnames(mission):
+    """
+    visible to short-wave infrared wavebands (common bandnames)
+    """
+
+    return list(SENSORS[mission].common_bands)
+
+def py6S_sensor(image,mission):
+    """
+    Py6S satellite_sensor name from satellite mission name.
+    *Modified to match either Sentinel-2A or Sentinel-2B.
+    """
+    return SENSORS[mission].py6s_sensor
+
+def eeCollection(mission):
+    """
+    Earth Engine image collection name from satellite mission name
+    ('Sentinel2' for both Sentinel-2A and 2B, see SENSORS)
+    """
+
+    return SENSORS[_ALIASES.get(mission, mission)].collection
+
+def sunAngleFilter(mission):
+    """
+    Sun angle filter avoids where elevation < 15 degrees
+    """
+  
+    switch = {
+        'Sentinel-2A':ee.Filter.lt('MEAN_SOLAR_ZENITH_ANGLE',75),
+        'Sentinel-2B':ee.Filter.lt('MEAN_SOLAR_ZENITH_ANGLE',75),
+        'Landsat8':ee.Filter.gt('SUN_ELEVATION',15),
+        'Landsat7':ee.Filter.gt('SUN_ELEVATION',15),
+        'Landsat5':ee.Filter.gt('SUN_ELEVATION',15),
+        'Landsat4':ee.Filter.gt('SUN_ELEVATION',15)
+    }
+
+    return switch[mission]
+
+def ESUNs(image, mission, band):
+    """
+    ESUN (Exoatmospheric spectral irradiance) of one band, see esun
+    """
+
+    return float(esun(image, mission, [band])[0])
+
+def esun(image, mission, bands=None, properties=None):
+    """
+    ESUN (Exoatmospheric spectral irradiance) of 'bands' (default: all bands)
+    as a NumPy array.
+
+    Sentinel-2 values are scene metadata (SOLAR_IRRADIANCE_*): they are read
+    from 'properties' if given (i.e. image.getInfo()['properties']), otherwise
+    all of them are fetched in one request.
+
+    References
+    ----------
+
+    Landsat 4  [1]
+    Landsat 5  [1]
+    Landsat 7  [1]
+    Landsat 8  [2]
+
+
+    [1] Chander et al. (2009) Summary of current radiometric calibration
+        coefficients for Landsat MSS, TM, ETM+, and EO-1 ALI sensors.
+        Remote Sensing of Environment. 113, 898-903
+
+    [2] Benjamin Leutner (https://github.com/bleutner/RStoolbox)
+    """
+
+    sensor = SENSORS[mission]
+    if bands is None:
+        bands = sensor.ee_bands
+
+    # Coefficients for Landsat:
+    if sensor.esun is not None:
+        return sensor.esun[sensor.indices(bands)]
+
+    # For Sentinel-2:
+    keys = ['SOLAR_IRRADIANCE_' + band for band in bands]
+    if properties is None:
+        properties = infocache.getInfo(ee.Image(image).toDictionary(keys))
+
+    return np.array([properties[key] for key in keys], dtype=float)
+
+def solar_z(image, mission, properties=None):
+    """
+    solar zenith angle (degrees)
+
+    read from 'properties' if given (i.e. image.getInfo()['properties'])
+    """
+
+    def sentinel2(image):
+        if properties is not None:
+            return properties['MEAN_SOLAR_ZENITH_ANGLE']
+        return infocache.getInfo(image.get('MEAN_SOLAR_ZENITH_ANGLE'))
+  
+    def landsat(image):
+        if properties is not None:
+            return 90 - properties['SUN_ELEVATION']
+        return infocache.getInfo(ee.Number(90).subtract(image.get('SUN_ELEVATION')))
+  
+    switch = {
+        'Sentinel-2A':sentinel2,
+        'Sentinel-2B':sentinel2,
+        'Landsat8':landsat,
+        'Landsat7':landsat,
+        'Landsat5':landsat,
+        'Landsat4':landsat
+    }
+
+    getSolarZenith = switch[mission]
+
+    return getSolarZenith(image)
+
+
+def cloud_cover(mission):
+    """
+    cloud cover percentage
+    """
+
+    cloud_S2 = ['CLOUDY_PIXEL_PERCENTAGE']
+  
+    cloudLandsat = ['CLOUD_COVER']
+  
+    switch = {
+        'Sentinel-2A':cloud_S2,
+        'Sentinel-2B':cloud_S2,
+        'Landsat8':cloudLandsat,
+        'Landsat7':cloudLandsat,
+        'Landsat5':cloudLandsat,
+        'Landsat4':cloudLandsat
+    }
+
+    getCloudCover = switch[mission]
+
+    return getCloudCover
+
+
+def TOA(image, mission):
+
+    switch = {
+        'Sentinel-2A':image.divide(10000).set(image.toDictionary(image.propertyNames())),
+        'Sentinel-2B':image.divide(10000).set(image.toDictionary(image.propertyNames())),
+        'Landsat8':image,
+        'Landsat7':image,
+        'Landsat5':image,
+        'Landsat4':image
+    }
+
+    return switch[mission]
\ No newline at end of file
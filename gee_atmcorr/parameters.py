@@ -0,0 +1,260 @@
+"""
+Required parameters that changes among satellites:
+Set of parameters for atmospheric correction
+Adapted from Sam Murphy
+By Luis Lizcano-Sandoval
+09/28/2020
+"""
+
+import datetime
+import functools
+import math
+import numpy as np
+from . import lazy
+ee = lazy.Module('ee')
+from . import mission_specifics as mn
+from . import elevation
+from . import ancillary
+from . import infocache
+
+# Py6S is imported inside the function that runs 6S (fast start-up of workers)
+
+@functools.lru_cache(maxsize=None)
+def wavelength(srf):
+    """
+    Py6S spectral response function from its PredefinedWavelengths name
+    """
+    from Py6S import Wavelength, PredefinedWavelengths
+    return Wavelength(getattr(PredefinedWavelengths, srf))
+
+def radiance_multipliers(ESUN, solar_z, py_date):
+    """
+    TOA reflectance to at-sensor radiance conversion factors, for an array of ESUNs
+    """
+    solar_angle_correction = math.cos(math.radians(solar_z))
+
+    # Earth-Sun distance (from day of year)
+    doy = py_date.timetuple().tm_yday
+    # http://physics.stackexchange.com/questions/177949/earth-sun-distance-on-a-given-day-of-the-year
+    d = 1 - 0.01672 * math.cos(0.9856 * (doy-4)) 
+
+    return np.asarray(ESUN)*solar_angle_correction/(math.pi*d**2)
+
+def calibration(image, mission, bands, info):
+    """
+    Spectral response function name and TOA reflectance to radiance factor
+    of each band of one scene, for all bands at once. info: image properties
+    """
+    sensor = mn.SENSORS[mission]
+    py_date = datetime.datetime.utcfromtimestamp(info['system:time_start']/1000)
+    multipliers = radiance_multipliers(mn.esun(image,mission,bands,info),mn.solar_z(image,mission,info),py_date)
+    srfs = [sensor.srf[i] for i in sensor.indices(bands)]
+    return list(zip(srfs, multipliers.tolist()))
+
+@functools.lru_cache(maxsize=None)
+def coefficients(srf, h2o, o3, aot, solar_z, month, day, km):
+    """
+    6S outputs for one waveband: direct and diffuse solar irradiance, path
+    radiance and total transmissivity. Cached, so scenes sharing their inputs
+    (e.g. the tiles of a datatake, see datatake.py) run 6S once per band.
+    """
+    # Instantiate
+    from Py6S import SixS, AtmosProfile, AeroProfile, Geometry
+    s = SixS()
+
+    # Atmospheric constituents
+    s.atmos_profile = AtmosProfile.UserWaterAndOzone(h2o,o3)
+    s.aero_profile = AeroProfile.Continental
+    s.aot550 = aot
+
+    # Earth-Sun-satellite geometry
+    s.geometry = Geometry.User()
+    s.geometry.view_z = 9            # For Sentinel is ~10° and Landsat ~7.5°. So, 9° is in between both. (Roy et al. 2017. https://doi.org/10.1016/j.rse.2017.06.019)
+    s.geometry.solar_z = solar_z     # solar zenith angle
+    s.geometry.month = month         # month and day used for Earth-Sun distance
+    s.geometry.day = day             # month and day used for Earth-Sun distance
+    s.altitudes.set_sensor_satellite_level()
+    s.altitudes.set_target_custom_altitude(km) ## Target altitude (sea level = 0.001 km)
+
+    # run 6S for this waveband
+    s.wavelength = wavelength(srf)
+    s.run()
+
+    # extract 6S outputs
+    Edir = s.outputs.direct_solar_irradiance             #direct solar irradiance
+    Edif = s.outputs.diffuse_solar_irradiance            #diffuse solar irradiance
+    Lp   = s.outputs.atmospheric_intrinsic_radiance      #path radiance
+    absorb  = s.outputs.trans['global_gas'].upward       #absorption transmissivity
+    scatter = s.outputs.trans['total_scattering'].upward #scattering transmissivity
+    tau2 = absorb*scatter                                #total transmissivity
+
+    return Edir, Edif, Lp, tau2
+
+def BOA(mission,image,bandname,altitude=None,scene=None,band=None):
+    """
+    Surface reflectance of one band.
+
+    altitude: target altitude for 6S, None = sea level (coastal/oceanic
+    targets), a number in km, or 'SRTM' for inland targets (see elevation.py)
+    scene: prefetched scene (see ancillary.prefetch), saves the requests below;
+    with scene['atmosphere'] (see datatake.share) the 6S inputs of its group are used
+    band: (srf, multiplier) of this band, see calibration (computed here if None)
+    """
+    
+    ##Load set of parameters:
+    image = ee.Image(image)
+        
+    # Top of atmosphere reflectance:
+    toa = mn.TOA(image,mission)
+    
+    # Image metadata:
+    if scene is None:
+        info = infocache.getInfo(ee.Image(image))['properties']
+    else:
+        info = scene['properties']
+
+    # Solar zenith angle:
+    solar_z = mn.solar_z(image,mission,info)
+
+    # Get the centroid coordinates of the image:
+    imgGeometry = image.geometry().buffer(10)
+    imgCentroid = imgGeometry.centroid()
+    if scene is None:
+        coord = infocache.getInfo(imgCentroid)['coordinates'] #point only
+    else:
+        coord = scene['coordinates']
+
+    # 6S inputs: this scene, or those shared by its datatake group (see datatake.py)
+    if scene is not None and 'atmosphere' in scene:
+        atmosphere = scene['atmosphere']
+        target, target_time, target_z = atmosphere['coordinates'], atmosphere['system:time_start'], atmosphere['solar_z']
+        target_point = None
+    else:
+        target, target_time, target_z = coord, info['system:time_start'], solar_z
+        target_point = imgCentroid
+    target_date = datetime.datetime.utcfromtimestamp(target_time/1000)
+
+    # Target altitude (km). Sea level by default; SRTM altitudes are cached by location,
+    # so prefetching them with the scenes (ancillary.prefetch with altitude='SRTM') avoids a request here.
+    km = elevation.resolve(altitude,target)
+
+    # Predefined atmospheric constituents (Water, Ozone, Aerosols), one request per scene:
+    h2o, o3, aot = ancillary.constituents(target,target_time,target_point)
+
+    # Spectral response function and radiance factor (ESUN from the metadata already fetched)
+    if band is None:
+        band = calibration(image,mission,[bandname],info)[0]
+    srf, multiplier = band
+
+    def toa_to_rad(bandname):
+        
+        #Converts top of atmosphere reflectance to at-sensor radiance"
+        
+        # at-sensor radiance
+        rad = toa.select(bandname).multiply(float(multiplier))
+    
+        return rad
+    
+
+    def surface_reflectance(bandname):
+        
+        #Calculate surface reflectance from at-sensor radiance given waveband name"
+         
+        # 6S outputs for this waveband
+        Edir, Edif, Lp, tau2 = coefficients(srf,h2o,o3,aot,target_z,target_date.month,target_date.day,km)
+
+        # radiance to surface reflectance
+        rad = toa_to_rad(bandname)
+        ref = rad.subtract(Lp).multiply(math.pi).divide(tau2*(Edir+Edif))
+
+        return ref
+    
+#     ## Function to get band scales
+        ##Update: It does not make sense to run these function to rescale bands,
+        ## because when the image is exported to Assets will be resampled to minimum res.
+#     def band_scale(bandname):
+        
+#         if 'S2A_MSI' == sensor:
+#             bandRes = {
+#                 'B1':60,
+#                 'B2':10,
+#                 'B3':10,
+#                 'B4':10,
+#                 'B5':20,
+#                 'B6':20,
+#                 'B7':20,
+#                 'B8':10,
+#                 'B8A':20,
+#                 'B9':60,
+#                 'B10':60,
+#                 'B11':20,
+#                 'B12':20
+#                 }
+#         elif 'S2B_MSI' == sensor:
+#             bandRes = {
+#                 'B1':60,
+#                 'B2':10,
+#                 'B3':10,
+#                 'B4':10,
+#                 'B5':20,
+#                 'B6':20,
+#                 'B7':20,
+#                 'B8':10,
+#                 'B8A':20,
+#                 'B9':60,
+#                 'B10':60,
+#                 'B11':20,
+#                 'B12':20
+#                 }
+#         elif 'LANDSAT_OLI' == sensor:
+#             bandRes = {
+#                 'B1':30,
+#                 'B2':30,
+#                 'B3':30,
+#                 'B4':30,
+#                 'B5':30,
+#                 'B6':30,
+#                 'B7':30,
+#                 'B8':15,
+#                 'B9':15
+#                 }
+#         elif 'LANDSAT_ETM' == sensor:
+#             bandRes = {
+#                 'B1':30,
+#                 'B2':30,
+#                 'B3':30,
+#                 'B4':30,
+#                 'B5':30,
+#                 'B7':30
+#                 }
+#         elif 'LANDSAT_TM' == sensor:
+#             bandRes = {
+#                 'B1':30,
+#                 'B2':30,
+#                 'B3':30,
+#                 'B4':30,
+#                 'B5':30,
+#                 'B7':30
+#                 }
+
+#         return (bandRes[bandname])
+    
+#     ## Function for resampling bands
+#     def resample(sr):
+#         ## Display a bilinear resampled image with 10m pixel spacing.
+#         band = sr.select(bandname)
+#         proj = band.projection()
+#         bandScale = band_scale(bandname)
+#         resample = sr.resample('bilinear').reproject({\
+#                 'crs': proj,
+#                 'scale': bandScale,
+#                 });
+#         return resample
+    
+    
+    
+    sr = surface_reflectance(bandname)
+#     sr_resample = resample(sr)
+    
+    
+    return sr
@@ -0,0 +1,261 @@
+"""
+profiler.py
+
+Size and complexity of the expression graph of any ee object (e.g. the output
+of getBOA.forImage/forCollection): node count, depth, serialized bytes and a
+histogram of the operations. Bloated graphs (per-band addBands, nested
+ee.Algorithms.If, copied properties, chained merges) are what make exports
+slow on the server.
+
+Usage
+p = profiler.profile(getBOA.forImage(img,mission,bands))
+print(profiler.report(p))
+profiler.save(p,'baseline.json')
+profiler.check(obj,'baseline.json',tolerance=0.1)  # raises GraphTooLarge
+
+Regression mode (synthetic scene on the local emulator, see ee_local.py; 6S
+is not run, the graph does not depend on its outputs):
+python -m gee_atmcorr.profiler --baseline baseline.json [--update]
+"""
+
+import collections
+import json
+import sys
+
+GraphProfile = collections.namedtuple('GraphProfile', ['nodes', 'depth', 'bytes', 'operations'])
+
+# metrics compared against a baseline
+METRICS = ('nodes', 'depth', 'bytes')
+
+
+class GraphTooLarge(Exception):
+    """The graph grew beyond the allowed threshold."""
+
+
+def _invocation(value):
+    # cloud API format / legacy format
+    if 'functionInvocationValue' in value:
+        invocation = value['functionInvocationValue']
+        return invocation['functionName'], invocation.get('arguments', {})
+    if value.get('type') == 'Invocation':
+        return value['functionName'], value.get('arguments', {})
+    return None
+
+
+def _reference(value):
+    if 'valueReference' in value:
+        return value['valueReference']
+    if value.get('type') == 'ValueRef':
+        return value['value']
+    return None
+
+
+def _graph(expression):
+    """
+    Function name (None for plain values) and children of every node, and the
+    root node. Nodes are the shared values of the expression plus every
+    inline invocation.
+    """
+    if 'values' in expression:
+        shared = expression['values']
+        root = expression['result']
+    elif expression.get('type') == 'CompoundValue':
+        shared = dict(expression['scope'])
+        root = ('inline', -1)
+        shared[root] = expression['value']
+    else:
+        shared = {}
+        root = ('inline', -1)
+        shared[root] = expression
+
+    names = {}
+    children = {}
+    inline = 0
+    pending = list(shared.items())
+    while pending:
+        node, value = pending.pop()
+        invocation = _invocation(value) if isinstance(value, dict) else None
+        names[node] = invocation[0] if invocation else None
+        kids = []
+        scan = [invocation[1] if invocation else value]
+        while scan:
+            item = scan.pop()
+            if isinstance(item, dict):
+                reference = _reference(item)
+                if reference is not None:
+                    kids.append(reference)
+                elif _invocation(item):
+                    child = ('inline', inline)
+                    inline += 1
+                    pending.append((child, item))
+                    kids.append(child)
+                else:
+                    scan.extend(item.values())
+            elif isinstance(item, list):
+                scan.extend(item)
+        children[node] = kids
+
+    return names, children, root
+
+
+def _depth(names, children, root):
+    """
+    longest chain of invocations from the root (iterative, graphs can be deep)
+    """
+    depth = {}
+    seen = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node in depth:
+            continue
+        if not expanded:
+            # shared sub-graphs are walked once
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.append((node, True))
+            stack.extend((kid, False) for kid in children[node] if kid not in depth)
+            continue
+        below = max([depth[kid] for kid in children[node]] or [0])
+        depth[node] = below + (1 if names[node] else 0)
+    return depth[root]
+
+
+def profile(obj):
+    """
+    GraphProfile of an ee object (or of its serialized JSON string)
+    """
+    serialized = obj if isinstance(obj, str) else obj.serialize()
+    names, children, root = _graph(json.loads(serialized))
+    operations = collections.Counter(name for name in names.values() if name)
+    return GraphProfile(nodes=sum(operations.values()),
+                        depth=_depth(names, children, root),
+                        bytes=len(serialized.encode('utf-8')),
+                        operations=operations)
+
+
+def report(graph, top=15):
+    """
+    human readable summary of a GraphProfile
+    """
+    lines = ['nodes: %d' % graph.nodes,
+             'depth: %d' % graph.depth,
+             'bytes: %d' % graph.bytes,
+             'operations:']
+    for name, count in graph.operations.most_common(top):
+        lines.append('  %6d  %s' % (count, name))
+    return '\n'.join(lines)
+
+
+def save(graph, path):
+    """
+    store a GraphProfile as a JSON baseline
+    """
+    with open(path, 'w') as f:
+        json.dump(dict(graph._asdict(), operations=dict(graph.operations)), f, indent=1, sort_keys=True)
+
+
+def _baseline(baseline):
+    if isinstance(baseline, str):
+        with open(baseline) as f:
+            return json.load(f)
+    if isinstance(baseline, GraphProfile):
+        return baseline._asdict()
+    return dict(baseline)
+
+
+def check(obj, baseline, tolerance=0.0):
+    """
+    Regression check: raise GraphTooLarge if nodes, depth or bytes of the graph
+    of 'obj' exceed the baseline by more than 'tolerance' (a fraction).
+
+    obj: ee object, serialized string or GraphProfile
+    baseline: GraphProfile, dict of limits or path of a saved baseline
+    """
+    graph = obj if isinstance(obj, GraphProfile) else profile(obj)
+    limits = _baseline(baseline)
+    grown = []
+    for metric in METRICS:
+        if metric in limits and getattr(graph, metric) > limits[metric] * (1 + tolerance):
+            grown.append('%s %d > %d' % (metric, getattr(graph, metric), limits[metric]))
+    if grown:
+        raise GraphTooLarge('expression graph grew beyond the baseline (tolerance %g): %s'
+                            % (tolerance, ', '.join(grown)))
+    return graph
+
+
+def _synthetic_output(mission, scenes):
+    """
+    forImage/forCollection output for synthetic scenes on the local emulator,
+    with fixed 6S outputs (no Py6S or 6S executable needed)
+    """
+    import datetime
+    from . import ee_local
+    backend = ee_local.install()
+    ee_local.synthetic_catalog(backend, start=datetime.datetime(2019, 4, 1), end=datetime.datetime(2019, 5, 1))
+    import ee
+    from . import getBOA
+    from . import mission_specifics as mn
+    from . import parameters
+
+    coefficients = parameters.coefficients
+    parameters.coefficients = _coefficients
+    try:
+        return _synthetic_scenes(ee, ee_local, backend, getBOA, mn, mission, scenes)
+    finally:
+        parameters.coefficients = coefficients
+
+
+def _coefficients(srf, h2o, o3, aot, solar_z, month, day, km):
+    # stand-in for parameters.coefficients: Edir, Edif, Lp, tau2 (constants, so
+    # the serialized graph is the same whatever the inputs)
+    return 1000.0, 100.0, 5.0, 0.8
+
+
+def _synthetic_scenes(ee, ee_local, backend, getBOA, mn, mission, scenes):
+    import datetime
+
+    ids = []
+    for i in range(scenes):
+        date = datetime.datetime(2019, 4, 11 + i, 16, 5)
+        if mission == 'Sentinel2':
+            index = date.strftime('%Y%m%dT%H%M%S_') + date.strftime('%Y%m%dT%H%M%S_T17RNH')
+        else:
+            index = 'LC08_015043_' + date.strftime('%Y%m%d')
+        ee_local.add_scene(backend, mn.eeCollection(mission), index, date, (-82.5, 27.0, -82.0, 27.5))
+        ids.append(index)
+
+    bands = ['B1', 'B2', 'B3', 'B4', 'B5', 'B8', 'B11', 'B12'] if mission == 'Sentinel2' \
+        else ['B1', 'B2', 'B3', 'B4', 'B5', 'B6', 'B7']
+    if scenes == 1:
+        return getBOA.forImage(ee.Image(mn.eeCollection(mission) + '/' + ids[0]), mission, bands)
+    collection = ee.ImageCollection(mn.eeCollection(mission)).filter(ee.Filter.inList('system:index', ids))
+    return getBOA.forCollection(collection, mission, bands, ids)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Expression graph regression check (local emulator).')
+    parser.add_argument('--baseline', required=True, help='baseline JSON file')
+    parser.add_argument('--mission', default='Sentinel2', choices=['Sentinel2', 'Landsat8'])
+    parser.add_argument('--scenes', type=int, default=1, help='1 = forImage, more = forCollection')
+    parser.add_argument('--tolerance', type=float, default=0.0, help='allowed growth (fraction)')
+    parser.add_argument('--update', action='store_true', help='write the current profile as the baseline')
+    args = parser.parse_args(argv)
+
+    graph = profile(_synthetic_output(args.mission, args.scenes))
+    print(report(graph))
+    if args.update:
+        save(graph, args.baseline)
+        return 0
+    try:
+        check(graph, args.baseline, args.tolerance)
+    except GraphTooLarge as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
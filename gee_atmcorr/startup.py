@@ -0,0 +1,95 @@
+"""
+startup.py
+
+Start-up time of worker processes, i.e. what every process of a pool pays
+before it corrects its first scene: a fresh interpreter importing the modules
+of this project. 'ee' and Py6S are loaded lazily (see lazy.py), so importing
+getBOA should not load them. NumPy is imported eagerly (band tables, rasters
+of the local fills) and is most of the remaining import time (~100 ms).
+
+Usage
+python -m gee_atmcorr.startup [--workers 8] [--modules gee_atmcorr.getBOA] [--eager]
+report = startup.measure(['gee_atmcorr.getBOA'], workers=8)
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ['gee_atmcorr.getBOA']
+
+# run in each worker: import the modules and report what was loaded
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+print(json.dumps({'import': time.perf_counter() - start,
+                  'loaded': [m for m in ('ee', 'Py6S', 'numpy') if m in sys.modules]}))
+"""
+
+
+def _worker(modules, eager):
+    """
+    seconds until a fresh interpreter has imported 'modules', and the heavy
+    modules it loaded
+    """
+    if eager:
+        modules = ['ee', 'Py6S'] + list(modules)
+    env = dict(os.environ)
+    # the directory holding the gee_atmcorr package
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join([root] + [p for p in [env.get('PYTHONPATH')] if p])
+
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', _PROBE] + list(modules), env=env,
+                         stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    total = time.perf_counter() - start
+    result = json.loads(out)
+    result['total'] = total
+    return result
+
+
+def measure(modules=MODULES, workers=8, eager=False):
+    """
+    Start 'workers' fresh interpreters one after the other and time them.
+
+    eager: import 'ee' and Py6S up front too, i.e. the cost without lazy loading
+    Returns {'total': [s,...], 'import': [s,...], 'loaded': [...]}
+    """
+    runs = [_worker(modules, eager) for _ in range(workers)]
+    return {'total': [run['total'] for run in runs],
+            'import': [run['import'] for run in runs],
+            'loaded': sorted(set(name for run in runs for name in run['loaded']))}
+
+
+def report(results):
+    """
+    human readable summary of measure()
+    """
+    lines = []
+    for key in ('total', 'import'):
+        values = [1000 * value for value in results[key]]
+        lines.append('%-6s  median %7.1f ms  min %7.1f ms  max %7.1f ms'
+                     % (key, statistics.median(values), min(values), max(values)))
+    lines.append('loaded: ' + (', '.join(results['loaded']) or 'none of ee, Py6S, numpy'))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Worker start-up time (fresh interpreter + imports).')
+    parser.add_argument('--workers', type=int, default=8, help='number of interpreters to start')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='modules each worker imports')
+    parser.add_argument('--eager', action='store_true', help='also import ee and Py6S up front')
+    args = parser.parse_args(argv)
+
+    print(report(measure(args.modules, args.workers, args.eager)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Shared fixtures: the local Earth Engine emulator (see bin/ee_local.py) with a
+synthetic catalog, and a deterministic stand-in for the 6S model so the tests
+run without the 6S executable.
+"""
+
+import datetime
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import ancillary
+from gee_atmcorr import elevation
+from gee_atmcorr import parameters
+
+
+def _py6s():
+    # outputs depend on the inputs, so that scenes with different inputs differ
+    module = types.ModuleType('Py6S')
+    module.runs = []
+
+    class Wavelengths():
+        def __getattr__(self, name):
+            return name
+
+    class Outputs():
+        def __init__(self, s):
+            self.direct_solar_irradiance = 1000.0 - 2 * s.geometry.solar_z
+            self.diffuse_solar_irradiance = 100.0 + 100 * s.aot550
+            self.atmospheric_intrinsic_radiance = 5.0 + 10 * s.aot550 + s.atmos_profile[0]
+            upward = types.SimpleNamespace(upward=0.9 - s.atmos_profile[1])
+            self.trans = {'global_gas': upward, 'total_scattering': upward}
+
+    class Altitudes():
+        def set_sensor_satellite_level(self):
+            pass
+
+        def set_target_custom_altitude(self, km):
+            self.km = km
+
+    class SixS():
+        def __init__(self):
+            self.altitudes = Altitudes()
+
+        def run(self):
+            module.runs.append(self.wavelength)
+            self.outputs = Outputs(self)
+
+    module.PredefinedWavelengths = Wavelengths()
+    module.Wavelength = lambda name: name
+    module.SixS = SixS
+    module.AtmosProfile = types.SimpleNamespace(UserWaterAndOzone=lambda h2o, o3: (h2o, o3))
+    module.AeroProfile = types.SimpleNamespace(Continental='Continental')
+    module.Geometry = types.SimpleNamespace(User=types.SimpleNamespace)
+    return module
+
+
+@pytest.fixture
+def py6s(monkeypatch):
+    module = _py6s()
+    monkeypatch.setitem(sys.modules, 'Py6S', module)
+    parameters.coefficients.cache_clear()
+    parameters.wavelength.cache_clear()
+    yield module
+    parameters.coefficients.cache_clear()
+    parameters.wavelength.cache_clear()
+
+
+@pytest.fixture
+def backend(py6s):
+    backend = ee_local.install()
+    ee_local.synthetic_catalog(backend, start=datetime.datetime(2019, 4, 1), end=datetime.datetime(2019, 5, 1))
+    ancillary.clear_cache()
+    elevation.clear_cache()
+    yield backend
+    ancillary.clear_cache()
+    elevation.clear_cache()
+    ee_local.uninstall()
+
+
+def add_sentinel2(backend, day, hour=16, bbox=(-82.5, 27.0, -82.0, 27.5), properties=None):
+    """
+    add a Sentinel-2 scene, returns its system:index
+    """
+    date = datetime.datetime(2019, 4, day, hour, 5)
+    index = date.strftime('%Y%m%dT%H%M%S_') + date.strftime('%Y%m%dT%H%M%S_T17RNH')
+    ee_local.add_scene(backend, 'COPERNICUS/S2', index, date, bbox, properties=properties)
+    return index
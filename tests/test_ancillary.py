@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import ancillary
+from gee_atmcorr import climatology
+
+POINTS = [[-82.3, 27.2], [10.5, -40.2]]
+
+
+def _drop(backend, collection_id, start, end):
+    # remove the images of a collection acquired in [start, end)
+    def kept(image):
+        date = ee_local._EPOCH + datetime.timedelta(milliseconds=image.props['system:time_start'])
+        return not start <= date < end
+    backend.assets[collection_id] = ee_local._Collection(i for i in backend.assets[collection_id] if kept(i))
+
+
+@pytest.mark.parametrize('name', ['constituents.parquet', 'constituents.arrow'])
+def test_export_warm_round_trip(backend, tmp_path, name):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / name)
+    pairs = list(ancillary.daily(POINTS, datetime.datetime(2019, 4, 11), datetime.datetime(2019, 4, 14)))
+
+    backend.reset()
+    assert ancillary.export(pairs, path, batch_size=4) == 6
+    assert backend.calls == 2
+    assert ancillary._cache == {}
+
+    assert ancillary.warm(path) == 6
+    assert set(ancillary._cache) == set(ancillary._key(coord, ancillary._millis(date)) for coord, date in pairs)
+
+    backend.reset()
+    for coord, date in pairs:
+        ancillary.constituents(coord, date)
+    assert backend.calls == 0
+
+
+@pytest.mark.parametrize('local', [False, True])
+def test_sources_of_filled_values(backend, tmp_path, local):
+    if local:
+        climatology.snapshot(str(tmp_path), step=10.0)
+        ancillary.fallback(str(tmp_path))
+    _drop(backend, 'TOMS/MERGED', datetime.datetime(2019, 4, 1), datetime.datetime(2019, 5, 1))
+    _drop(backend, 'MODIS/006/MOD08_M3', datetime.datetime(2019, 4, 1), datetime.datetime(2019, 5, 1))
+    try:
+        columns = next(ancillary.resolve([(POINTS[0], datetime.datetime(2019, 4, 15, 16))]))
+    finally:
+        ancillary.fallback(None)
+
+    assert columns['o3_source'] == ['ozone_fill']
+    assert columns['aot_source'] == ['AOT_stack']
+    assert columns['h2o_source'] == ['NCEP']
+    assert all(0 < value < 1 for value in columns['o3'] + columns['aot'])
@@ -0,0 +1,29 @@
+import json
+
+import numpy as np
+import pytest
+
+from gee_atmcorr import climatology
+
+
+def _snapshot(directory, ozone, aot):
+    rows, cols = ozone.shape[1:]
+    np.save(str(directory / 'ozone.npy'), ozone.astype(np.float32))
+    np.save(str(directory / 'aot.npy'), aot.astype(np.float32))
+    with open(str(directory / 'grid.json'), 'w') as f:
+        json.dump({'step': 180 / rows, 'west': -180, 'north': 90, 'rows': rows, 'cols': cols}, f)
+    return climatology.load(str(directory))
+
+
+def test_cells_without_data_take_nearest_cell(tmp_path):
+    ozone = np.full((366, 4, 8), 300.0)
+    ozone[:, 0, :] = np.nan
+    ozone[:, 1, :] = 250.0
+    aot = np.full((12, 4, 8), 0.1)
+    aot[3] = np.nan
+    fills = _snapshot(tmp_path, ozone, aot)
+    april = 1555000000000
+
+    assert fills.ozone([[0, 80], [0, -80]], [april, april]).tolist() == [0.25, 0.3]
+    with pytest.raises(ValueError):
+        fills.aot([[0, 0]], [april])
@@ -0,0 +1,54 @@
+from gee_atmcorr import ee_local
+from gee_atmcorr import ancillary
+from gee_atmcorr import getBOA
+from gee_atmcorr import parameters
+from gee_atmcorr import profiler
+
+from conftest import add_sentinel2
+
+
+def mean(image):
+    return image.reduceRegion(ee_local.Reducer.mean()).getInfo()
+
+
+def test_reduce_region_without_geometry(backend):
+    image = ee_local.Image('users/samsammurphy/public/AOT_stack').select(['AOT_1'])
+    assert mean(image)['AOT_1'] > 0
+
+
+def test_list_root_keeps_its_first_node():
+    first = ee_local.List([ee_local.Geometry.Point([0, 0]).buffer(10)])
+    second = ee_local.List([ee_local.Geometry.Point([1, 1]).buffer(10)])
+    assert ee_local.fingerprint(first) != ee_local.fingerprint(second)
+    assert profiler.profile(first).nodes == 2
+
+
+def test_boa_prefetched_scene_matches_direct(backend, py6s):
+    image = ee_local.Image('COPERNICUS/S2/' + add_sentinel2(backend, 11))
+
+    direct = mean(parameters.BOA('Sentinel-2A', image, 'B2'))
+
+    ancillary.clear_cache()
+    parameters.coefficients.cache_clear()
+    scene = ancillary.prefetch([image])[0]
+    backend.reset()
+    prefetched = parameters.BOA('Sentinel-2A', image, 'B2', scene=scene)
+    assert backend.calls == 0
+    assert mean(prefetched) == direct
+
+
+def test_getinfo_calls(backend, py6s):
+    ids = [add_sentinel2(backend, day) for day in (11, 12, 13)]
+    bands = ['B1', 'B2', 'B3']
+
+    backend.reset()
+    getBOA.forImage(ee_local.Image('COPERNICUS/S2/' + ids[0]), 'Sentinel2', bands)
+    assert backend.calls == 1
+
+    # size + one prefetch; SRTM altitudes cost no extra request
+    ancillary.clear_cache()
+    collection = ee_local.ImageCollection('COPERNICUS/S2').filter(ee_local.Filter.inList('system:index', ids))
+    backend.reset()
+    output = getBOA.forCollection(collection, 'Sentinel2', bands, ids, altitude='SRTM')
+    assert backend.calls == 2
+    assert len(output.getInfo()['features']) == 3
@@ -0,0 +1,61 @@
+import datetime
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import ancillary
+from gee_atmcorr import datatake
+from gee_atmcorr import getBOA
+
+from conftest import add_sentinel2
+
+
+def test_mixed_collection_has_one_band_set(backend, py6s):
+    add_sentinel2(backend, 11)
+    ee_local.add_scene(backend, 'LANDSAT/LC08/C01/T1_TOA', 'LC08_015043_20190412',
+                       datetime.datetime(2019, 4, 12, 15, 50), (-83, 26, -82, 27))
+    ee_local.add_scene(backend, 'LANDSAT/LE07/C01/T1_TOA', 'LE07_015043_20190410',
+                       datetime.datetime(2019, 4, 10, 15, 50), (-83, 26, -82, 27))
+    mixed = ee_local.ImageCollection('COPERNICUS/S2') \
+        .merge(ee_local.ImageCollection('LANDSAT/LC08/C01/T1_TOA')) \
+        .merge(ee_local.ImageCollection('LANDSAT/LE07/C01/T1_TOA'))
+
+    features = getBOA.forMixedCollection(mixed).getInfo()['features']
+
+    assert [f['properties']['MISSION'] for f in features] == ['Landsat7', 'Sentinel-2A', 'Landsat8']
+    for f in features:
+        assert [b['id'] for b in f['bands']] == ['blue', 'green', 'red', 'nir', 'swir1', 'swir2', 'QA']
+
+
+def test_prefetch_in_batches(backend, py6s):
+    ids = [add_sentinel2(backend, day) for day in range(11, 16)]
+    images = [ee_local.Image('COPERNICUS/S2/' + i) for i in ids]
+
+    backend.reset()
+    scenes = ancillary.prefetch(images, batch_size=2)
+    assert backend.calls == 3
+    assert [s['properties']['system:index'] for s in scenes] == ids
+
+
+def test_datatake_altitude_in_same_request(backend, py6s):
+    ids = [add_sentinel2(backend, day) for day in range(11, 14)]
+    images = [ee_local.Image('COPERNICUS/S2/' + i) for i in ids]
+
+    calls = []
+    for altitude in [None, 'SRTM']:
+        ancillary.clear_cache()
+        backend.reset()
+        getBOA.prefetch(images, altitude, datatake=True)
+        calls.append(backend.calls)
+    assert calls == [2, 2]
+
+
+def test_datatake_mean_across_antimeridian():
+    lon, lat = datatake.mean_coordinates([[179.5, 10], [-179.5, 12]])
+    assert abs(abs(lon) - 180) < 1e-9 and lat == 11
+
+
+def test_empty_mixed_collection(backend, py6s):
+    add_sentinel2(backend, 11)
+    empty = ee_local.ImageCollection('COPERNICUS/S2').filter(ee_local.Filter.eq('system:index', 'none'))
+
+    assert getBOA.forMixedCollection(empty).getInfo()['features'] == []
+    assert getBOA.shared_bands([]) == []
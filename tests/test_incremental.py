@@ -0,0 +1,86 @@
+import datetime
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import incremental
+
+from conftest import add_sentinel2
+
+
+def test_run_survives_failed_polls(tmp_path, monkeypatch):
+    monitor = incremental.Monitor('Sentinel2', None, str(tmp_path / 'state.json'))
+    outcomes = [RuntimeError('unavailable'), RuntimeError('unavailable'), []]
+
+    def poll():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    waits = []
+    monkeypatch.setattr(monitor, 'poll', poll)
+    monkeypatch.setattr(incremental.time, 'sleep', waits.append)
+
+    monitor.run(interval=10, polls=3)
+
+    assert outcomes == []
+    assert [round(w) for w in waits] == [10, 20]
+
+
+def _monitor(path, export):
+    aoi = ee_local.Geometry.Rectangle([-82.4, 27.1, -82.3, 27.2])
+    return incremental.Monitor('Sentinel2', aoi, path, export=export, start='2019-04-06', workers=2)
+
+
+def _millis(day):
+    return int(datetime.datetime(2019, 4, day, 16, 5, tzinfo=datetime.timezone.utc).timestamp() * 1000)
+
+
+def test_polls_correct_new_and_late_scenes(backend, py6s, tmp_path):
+    path = str(tmp_path / 'state.json')
+    exported = []
+    monitor = _monitor(path, lambda output, scene, mission, bands: exported.append(scene['properties']['system:index']))
+
+    add_sentinel2(backend, 5)                                           # before 'start'
+    day8 = add_sentinel2(backend, 8)
+    add_sentinel2(backend, 9, properties={'CLOUDY_PIXEL_PERCENTAGE': 90.0})
+    assert [latency.id for latency in monitor.poll()] == [day8]
+    assert incremental.load_state(path) == {'high_water': _millis(8), 'done': {day8: _millis(8)}}
+
+    # nothing new: already corrected scenes are not corrected again
+    assert monitor.poll() == []
+
+    # a new scene, and one ingested late (before the high-water mark, within the lookback)
+    day12 = add_sentinel2(backend, 12)
+    day7 = add_sentinel2(backend, 7)
+    assert sorted(latency.id for latency in monitor.poll()) == sorted([day7, day12])
+    assert sorted(exported) == sorted([day8, day7, day12])
+
+    # the mark advanced and IDs older than the lookback window were pruned
+    assert incremental.load_state(path) == {'high_water': _millis(12), 'done': {day12: _millis(12)}}
+    monitor.close()
+
+    restarted = _monitor(path, None)
+    assert restarted.pending() == []
+    restarted.close()
+
+
+def test_failed_scenes_are_retried(backend, py6s, tmp_path):
+    path = str(tmp_path / 'state.json')
+    day8 = add_sentinel2(backend, 8)
+    day9 = add_sentinel2(backend, 9)
+
+    def export(output, scene, mission, bands):
+        if scene['properties']['system:index'] == day9:
+            raise RuntimeError('quota')
+
+    monitor = _monitor(path, export)
+    latencies = {latency.id: latency for latency in monitor.poll()}
+    assert latencies[day8].error is None
+    assert 'quota' in latencies[day9].error
+    assert incremental.load_state(path)['done'] == {day8: _millis(8)}
+    assert monitor.pending() == [day9]
+
+    monitor.export = None
+    assert [latency.error for latency in monitor.poll()] == [None]
+    assert incremental.load_state(path) == {'high_water': _millis(9), 'done': {day8: _millis(8), day9: _millis(9)}}
+    monitor.close()
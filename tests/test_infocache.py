@@ -0,0 +1,73 @@
+import itertools
+
+import pytest
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import infocache
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(infocache, '_excluded', [])
+    yield infocache.configure(':memory:')
+    infocache.disable()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # strictly increasing time, so that the order of use is unambiguous
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(infocache.time, 'time', lambda: float(next(ticks)))
+
+
+def test_repeated_expression_is_a_hit(backend, store):
+    point = ee_local.Geometry.Point([-82.3, 27.2]).buffer(10).centroid()
+    first = infocache.getInfo(point)
+
+    backend.reset()
+    assert infocache.getInfo(ee_local.Geometry.Point([-82.3, 27.2]).buffer(10).centroid()) == first
+    assert backend.calls == 0
+    assert infocache.stats()['hits'] == 1
+
+
+def test_expired_volatile_and_excluded_are_evaluated(backend, store):
+    number = ee_local.Number(1).add(2)
+
+    infocache.getInfo(number, ttl=0)
+    backend.reset()
+    assert infocache.getInfo(number) == 3
+    assert backend.calls == 1
+
+    backend.reset()
+    infocache.getInfo(ee_local.Number(5).add(1), volatile=True)
+    infocache.getInfo(ee_local.Number(5).add(1), volatile=True)
+    assert backend.calls == 2
+
+    infocache.exclude(lambda serialized: 'Number.multiply' in serialized)
+    backend.reset()
+    infocache.getInfo(ee_local.Number(5).multiply(2))
+    infocache.getInfo(ee_local.Number(5).multiply(2))
+    assert backend.calls == 2
+    assert infocache.stats()['entries'] == 1
+
+
+def test_least_recently_used_is_evicted(clock):
+    store = infocache._Store(':memory:', 30, 60)
+    for key in 'abc':
+        store.put(key, key * 10)
+    store.get('a')
+    store.put('d', 'd' * 10)
+
+    assert [store.get(key) is not None for key in 'abcd'] == [True, False, True, True]
+    store.close()
+
+
+def test_value_larger_than_store_is_not_stored():
+    store = infocache._Store(':memory:', 100, 60)
+    store.put('small', 'x' * 40)
+    store.put('large', 'x' * 101)
+
+    assert store.get('large') is None
+    assert store.get('small') == 'x' * 40
+    assert store.stats()['bytes'] == 40
+    store.close()
@@ -0,0 +1,40 @@
+import sys
+
+import pytest
+
+from gee_atmcorr import ee_local
+from gee_atmcorr import ancillary
+from gee_atmcorr import elevation
+from gee_atmcorr import profiler
+
+
+@pytest.fixture
+def synthetic(monkeypatch):
+    # the regression mode must not need Py6S
+    monkeypatch.setitem(sys.modules, 'Py6S', None)
+    ancillary.clear_cache()
+    elevation.clear_cache()
+    yield
+    ancillary.clear_cache()
+    elevation.clear_cache()
+    ee_local.uninstall()
+
+
+def test_baseline_round_trip(tmp_path, synthetic):
+    path = str(tmp_path / 'baseline.json')
+
+    assert profiler.main(['--baseline', path, '--update']) == 0
+    assert profiler.main(['--baseline', path]) == 0
+    assert profiler.main(['--baseline', path, '--scenes', '2']) == 1
+
+    graph = profiler.profile(profiler._synthetic_output('Sentinel2', 1))
+    assert profiler.check(graph, path) == graph
+
+
+def test_growth_past_tolerance_raises():
+    graph = profiler.GraphProfile(nodes=110, depth=10, bytes=1000, operations={})
+    baseline = {'nodes': 100, 'depth': 10, 'bytes': 1000}
+
+    assert profiler.check(graph, baseline, tolerance=0.1) == graph
+    with pytest.raises(profiler.GraphTooLarge, match='nodes 110 > 100'):
+        profiler.check(graph, baseline, tolerance=0.05)